@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+# Compares building a crosshatch grid path a cell at a time (as it used to be)
+# against the vectorized CrossHatchSquare.crosshatch_grid_path
+from spider_printer.paths.generation.crosshatch import CrossHatchSquare
+import numpy as np
+import time
+
+
+def legacy_grid_path(grid):
+    grid_path = []
+    for y in range(grid.shape[1]):
+        x_range = list(range(grid.shape[0]) if y % 2 == 0 else range(grid.shape[0]-1, -1, -1))
+        for x in x_range:
+            end = [1, 0] if y % 2 == 0 else [0, 0]
+            start = [0, 0] if y % 2 == 0 else [1, 0]
+            if x == x_range[-1]:
+                end[1] = 1
+            c_path = np.array(CrossHatchSquare(start=start, end=end, lines=int(grid[x, y])).path)
+            c_path[:, 0] += x
+            c_path[:, 1] += y
+            grid_path.extend(c_path)
+    return np.array(grid_path)
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    print(f"{'grid':>10} {'points':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>10}")
+    for n in [50, 100, 200, 400]:
+        grid = np.random.random((n, n)) * 10
+        t_legacy, legacy = timed(legacy_grid_path, grid)
+        t_new, path = timed(CrossHatchSquare.crosshatch_grid_path, grid)
+        assert np.array_equal(legacy, path)
+        print(f"{n:4d}x{n:<5d} {len(path):10d} {t_legacy:12.4f} {t_new:15.4f} {t_legacy / t_new:10.1f}")
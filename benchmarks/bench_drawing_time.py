@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+# Estimates how long the machine would take to draw a route with various
+# motion settings, using RecordingGPIO's simulated clock (no hardware needed)
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import RecordingGPIO
+from spider_printer.spider.planner import plan_route
+from spider_printer.paths.route import read_route, normalize_route
+import numpy as np
+import sys
+import time
+
+
+def simulate(route, plan=False, **settings):
+    gp = RecordingGPIO(call_time=50e-6)
+    s = Spider(gp=gp, auto_reset=False, **settings)
+    route = np.hstack([route, np.full((len(route), 1), s.initial_z)])
+
+    start = time.perf_counter()
+    if plan:
+        s.play(plan_route(s, route))
+    else:
+        for r in route:
+            s.position = r
+    wall_time = time.perf_counter() - start
+
+    steps = gp.step_counts(s.pins)
+    assert list(steps) == s.steps
+    n_edges = len(gp.trace)
+    return gp.duration, n_edges, wall_time
+
+
+if __name__ == "__main__":
+    fname = sys.argv[1] if len(sys.argv) > 1 else "paths/examples/self_portrait_1.xy"
+    n_points = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    route = normalize_route(read_route(fname)[:n_points], scale=5.0, center=True)
+
+    print(f"{'settings':>30} {'drawing time (s)':>18} {'pin writes':>12} {'sim time (s)':>14}")
+    for name, plan, settings in [
+        ("constant", False, {}),
+        ("trapezoid", False, dict(motion_profile="trapezoid", min_step_time=0.002)),
+        ("s-curve", False, dict(motion_profile="s-curve", min_step_time=0.002)),
+        ("trapezoid + planner", True, dict(motion_profile="trapezoid", min_step_time=0.002)),
+    ]:
+        duration, n_edges, wall_time = simulate(route, plan=plan, **settings)
+        print(f"{name:>30} {duration:18.2f} {n_edges:12d} {wall_time:14.3f}")
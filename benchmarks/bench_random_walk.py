@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+# Compares the original one step at a time clamped walk against clamped_walk,
+# for a million steps in boxes of different sizes
+from spider_printer.paths.generation.random_walk import clamped_walk
+import numpy as np
+import time
+
+
+def legacy_walk(x, steps, max_d):
+    positions = []
+    for s in steps.tolist():
+        x += s
+        if x > max_d:
+            x = max_d
+        if x < -max_d:
+            x = -max_d
+        positions.append(x)
+    return np.array(positions)
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    steps = np.random.default_rng(0).integers(-1, 2, 1_000_000)
+    print(f"{'max_d':>8} {'wall hits':>10} {'legacy (s)':>12} {'clamped (s)':>12} {'speedup':>10}")
+    for max_d in [5, 10, 20, 100, 1000]:
+        t_legacy, _ = timed(legacy_walk, 0, steps, max_d)
+        t_new, (_, top, bottom) = timed(clamped_walk, 0, steps, max_d)
+        print(f"{max_d:8d} {len(top) + len(bottom):10d} {t_legacy:12.3f} {t_new:12.3f} {t_legacy / t_new:10.1f}")
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+# Compares reading/writing routes as text (the old per-line loops,
+# and NumPy) against the memory-mapped binary format
+from spider_printer.paths.route import read_route, write_route
+import numpy as np
+import os
+import tempfile
+import time
+
+
+def legacy_write(fname, route):
+    with open(fname, "w") as f:
+        for p in route:
+            f.write(f"{p[0]}, {p[1]}\n")
+
+
+def legacy_read(fname):
+    route = []
+    with open(fname) as f:
+        for line in f:
+            route.append([float(x) for x in line.split(",")])
+    return np.array(route)
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'points':>10} {'method':>12} {'write (s)':>10} {'read (s)':>10} {'size (MB)':>10}")
+        for n in [10_000, 100_000, 1_000_000]:
+            route = np.cumsum(np.random.random((n, 2)) - 0.5, axis=0)
+            for method, fname, write, read in [
+                ("legacy .xy", "legacy.xy", legacy_write, legacy_read),
+                ("numpy .xy", "numpy.xy", write_route, read_route),
+                ("binary .xyb", "binary.xyb", write_route, read_route),
+            ]:
+                fname = os.path.join(tmp, fname)
+                t_write, _ = timed(write, fname, route)
+                t_read, loaded = timed(read, fname)
+                t_sum, _ = timed(np.sum, loaded)  # Touch every point (memory-mapped reads are lazy)
+                size = os.path.getsize(fname) / 1e6
+                print(f"{n:10d} {method:>12} {t_write:10.4f} {t_read + t_sum:10.4f} {size:10.2f}")
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+# Compares the original self avoiding random walk script (as a function)
+# against self_avoiding_random_walk, up to 2000x2000 grids
+from spider_printer.paths.generation.self_avoiding_random_walk import self_avoiding_random_walk
+import numpy as np
+import random
+import time
+
+
+def legacy_walk(grid_size, density, smooth=0.5):
+    grid = np.full((grid_size, grid_size), False)
+
+    def in_range(x, y):
+        r = grid_size // 2
+        dx = x - r
+        dy = y - r
+        return dx*dx + dy*dy < r * r
+
+    def taken(x, y):
+        if not in_range(x, y): return True
+        return grid[x, y]
+
+    moves = [[-1, 0], [1, 0], [0, 1], [0, -1]]
+    path = [[i//2 for i in grid.shape]]
+    while len(path) < grid.shape[0]*grid.shape[1]*density:
+        xy = [[path[-1][0]+m[0], path[-1][1]+m[1]] for m in moves]
+        free = [c for c in xy if not taken(*c)]
+        if len(free) == 0:
+            free = [c for c in xy if in_range(*c)]
+        c = free[random.randint(0, len(free)-1)]
+        grid[c[0], c[1]] = True
+        path.append(c)
+
+    path = np.array(path, dtype=float)
+    f = 1-smooth
+    for i in range(1, len(path)-1):
+        path[i] = f*path[i]+(smooth/2)*path[i-1]+(smooth/2)*path[i+1]
+    return path
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    density = 0.25
+    print(f"{'grid':>10} {'points':>10} {'legacy (s)':>12} {'engine (s)':>12} {'speedup':>10}")
+    for n in [100, 250, 500, 1000, 2000]:
+        t_legacy, _ = timed(legacy_walk, n, density)
+        t_new, path = timed(self_avoiding_random_walk, n, density)
+        print(f"{n:4d}x{n:<5d} {len(path):10d} {t_legacy:12.3f} {t_new:12.3f} {t_legacy / t_new:10.1f}")
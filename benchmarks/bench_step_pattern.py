@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+from spider_printer.spider.step_pattern import make_step_pattern
+import numpy as np
+import time
+
+
+def legacy_step_pattern(abs_steps):
+    # The original accumulator loop from Spider.position's setter
+    max_steps = max(abs_steps)
+    step_freq = np.array(abs_steps) / max_steps
+    cum_steps = np.zeros(3)
+    step_pattern = [[False, False, False]]
+    while True:
+
+        tot_steps = np.sum(step_pattern, axis=0)
+        if np.allclose(tot_steps, abs_steps):
+            break
+
+        cum_steps += step_freq
+        make_steps = cum_steps >= 1.0
+        for i in range(3):
+            if tot_steps[i] >= abs_steps[i]:
+                make_steps[i] = False
+
+        step_pattern.append(make_steps)
+        cum_steps -= step_pattern[-1]
+
+    return np.array(step_pattern, dtype=bool)
+
+
+def time_call(f, *args, max_time=1.0):
+    # Best-of timing, repeating until max_time has been spent
+    best = np.inf
+    start = time.perf_counter()
+    while True:
+        t = time.perf_counter()
+        f(*args)
+        best = min(best, time.perf_counter() - t)
+        if time.perf_counter() - start > max_time:
+            return best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    print(f"{'steps':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>10}")
+    for n in [10, 100, 1000, 10000, 100000]:
+        abs_steps = [n, int(rng.integers(0, n)), int(rng.integers(0, n))]
+
+        # The legacy loop is quadratic - don't wait for the biggest moves
+        t_legacy = np.nan
+        if n <= 10000:
+            t_legacy = time_call(legacy_step_pattern, abs_steps)
+
+        t_new = time_call(make_step_pattern, abs_steps)
+        print(f"{n:8d} {t_legacy:12.6f} {t_new:15.6f} {t_legacy / t_new:10.1f}")
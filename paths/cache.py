@@ -0,0 +1,163 @@
+from spider_printer.paths.route import read_route, write_binary
+import hashlib
+import inspect
+import json
+import numpy as np
+import os
+import shutil
+import tempfile
+from typing import Callable, Iterable
+
+# Generated routes (and compiled step streams) are cached on disk, named by a
+# hash of whatever they were made from, so re-running with the same inputs is
+# just a copy. Files used least recently are removed when the cache gets too big.
+# The source of the code that made them is part of the hash too, so changing a
+# generator means making its routes again (CACHE_VERSION is bumped whenever the
+# format of the cache itself changes).
+CACHE_VERSION = 2
+DEFAULT_DIRECTORY = os.environ.get("SPIDER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "spider_printer"))
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def file_digest(fname: str) -> str:
+    h = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def code_digest(obj) -> str:
+    # Hash of the source file defining a function, class or module
+    fname = inspect.getsourcefile(obj)
+    if fname is None or not os.path.exists(fname):
+        raise ValueError(f"Can't find the source of {obj!r} to hash")
+    return file_digest(fname)
+
+
+def cache_key(name: str, params: dict = None, files: Iterable[str] = (), code: Iterable = ()) -> str:
+    # Hash of a generator (or stage) name, its (JSON-serializable) parameters,
+    # the contents of its input files and the source of its code (the files
+    # defining the given functions, classes or modules)
+    h = hashlib.sha256()
+    h.update(json.dumps({"version": CACHE_VERSION, "name": name, "params": params or {}}, sort_keys=True).encode())
+    for fname in files:
+        h.update(file_digest(fname).encode())
+    for obj in code:
+        h.update(code_digest(obj).encode())
+    return h.hexdigest()
+
+
+def unseeded(params: dict = None) -> bool:
+    # Whether params are for a random generator without a seed, which would
+    # make something different every time (so there's nothing to cache)
+    return params is not None and "seed" in params and params["seed"] is None
+
+
+class RouteCache:
+
+    def __init__(self, directory: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        # An on-disk cache of files, evicting the least recently used once
+        # they take up more than max_bytes
+        self._directory = directory or DEFAULT_DIRECTORY
+        self._max_bytes = max_bytes
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def path(self, key: str, extension: str = "") -> str:
+        return os.path.join(self._directory, key + extension)
+
+    def get(self, key: str, extension: str = "") -> str:
+        # The cached file for the key (or None if there isn't one),
+        # marking it as recently used
+        fname = self.path(key, extension)
+        try:
+            os.utime(fname)
+        except FileNotFoundError:
+            return None
+        return fname
+
+    def put(self, key: str, fname: str, extension: str = "") -> str:
+        # Copy fname into the cache (atomically, so a half-copied file is never
+        # found), then evict old files if we need to. Returns the cached file.
+        cached = self.path(key, extension)
+        fd, tmp_name = tempfile.mkstemp(dir=self._directory, prefix=".cache-", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(fname, tmp_name)
+            os.replace(tmp_name, cached)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        self.evict(keep=cached)
+        return cached
+
+    def size(self) -> int:
+        return sum(e.stat().st_size for e in os.scandir(self._directory) if e.is_file())
+
+    def evict(self, keep: str = None):
+        # Remove the least recently used files until the cache fits in max_bytes
+        # (never removing keep, the file just added)
+        entries = sorted((e.stat().st_mtime_ns, e.stat().st_size, e.path)
+                         for e in os.scandir(self._directory) if e.is_file() and not e.name.startswith("."))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            os.unlink(path)
+            total -= size
+
+    def clear(self):
+        for e in os.scandir(self._directory):
+            if e.is_file():
+                os.unlink(e.path)
+
+
+def cached_file(fname: str, generate: Callable[[str], None], name: str, params: dict = None,
+                files: Iterable[str] = (), cache: RouteCache = None, code: Iterable = ()) -> bool:
+    # Make fname with generate(fname), unless the same generator has made it before
+    # from the same parameters, input files and code (generate itself, and code),
+    # in which case it's copied from the cache. Returns whether it came from the
+    # cache. With a seed of None in params, it's always made afresh.
+    if unseeded(params):
+        generate(fname)
+        return False
+    cache = cache or RouteCache()
+    extension = os.path.splitext(os.fspath(fname))[1]
+    key = cache_key(name, params, files, [generate, *code])
+    cached = cache.get(key, extension)
+    if cached is not None:
+        shutil.copyfile(cached, fname)
+        return True
+
+    generate(fname)
+    cache.put(key, fname, extension)
+    return False
+
+
+def cached_route(generate: Callable[[], np.ndarray], name: str, params: dict = None,
+                 files: Iterable[str] = (), cache: RouteCache = None, code: Iterable = ()) -> np.ndarray:
+    # The (N, 2) route returned by generate(), unless the same generator has made
+    # it before from the same parameters, input files and code (as for cached_file)
+    if unseeded(params):
+        return generate()
+    cache = cache or RouteCache()
+    key = cache_key(name, params, files, [generate, *code])
+    cached = cache.get(key, ".xyb")
+    if cached is not None:
+        return read_route(cached, mmap=False)
+
+    route = generate()
+    fd, tmp_name = tempfile.mkstemp(dir=cache.directory, prefix=".route-", suffix=".xyb")
+    os.close(fd)
+    try:
+        write_binary(tmp_name, route)
+        cache.put(key, tmp_name, ".xyb")
+    finally:
+        os.unlink(tmp_name)
+    return route
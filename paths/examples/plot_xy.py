@@ -1,12 +1,8 @@
+from spider_printer.paths.preview import plot_route
+from spider_printer.paths.route import read_route
 import matplotlib.pyplot as plt
-import numpy as np
 import sys
 
-path = []
-with open(sys.argv[1]) as f:
-    for line in f:
-        path.append([float(x) for x in line.split(",")])
-
-path = np.array(path)
-plt.plot(path[:, 0], path[:, 1], color="black")
+path = read_route(sys.argv[1])
+plot_route(path, color="black")
 plt.show()
@@ -0,0 +1,13 @@
+#!/usr/bin/python3
+# Convert between text (.xy) and binary (.xyb) routes, e.g.
+#   convert_route.py img2cross.xy img2cross.xyb
+from spider_printer.paths.route import read_route, write_route
+import sys
+
+if len(sys.argv) < 3:
+    print("Arguments: input route, output route")
+    quit()
+
+route = read_route(sys.argv[1])
+write_route(sys.argv[2], route)
+print(f"Converted {len(route)} points from {sys.argv[1]} to {sys.argv[2]}")
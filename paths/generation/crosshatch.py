@@ -1,3 +1,5 @@
+from spider_printer.paths.preview import plot_route, plot_segments, route_segments
+from spider_printer.paths.route import RouteWriter
 from typing import Tuple, Iterable
 import numpy as np
 
@@ -64,79 +66,147 @@ class CrossHatchSquare:
         path[:, 0] += offset[0]
         path[:, 1] += offset[1]
         plt.gca().set_aspect(1.0)
-        for i in range(1, len(path)):
-            plt.plot(path[i-1:i+1, 0], path[i-1:i+1, 1], color="black")
+        plot_segments(route_segments(path), color="black")
         plt.scatter(path[0:1, 0], path[0:1, 1], color="green")
         plt.scatter(path[-1:, 0], path[-1:, 1], color="red")
 
     @staticmethod
-    def crosshatch_grid_path(grid: np.ndarray, plot=False):
+    def crosshatch_grid_path(grid: np.ndarray, plot=False, first_row: int = 0):
 
+        # Hatch each cell of the grid, row by row (alternately left to right and
+        # right to left), exactly as CrossHatchSquare would for each cell, but
+        # working out every cell at once. The rows of the grid are numbered from
+        # first_row, so a band of rows can be hatched as part of a bigger grid.
         grid = np.asarray(grid)
-        grid_path = []
+        n_x, n_y = grid.shape
+
+        # Cells in drawing order
+        ys = np.repeat(np.arange(n_y), n_x) + first_row
+        xs = np.tile(np.arange(n_x), n_y)
+        xs[ys % 2 == 1] = n_x - 1 - xs[ys % 2 == 1]
+        lines = np.maximum(grid[xs, ys - first_row].astype(np.int64), 2)
+
+        # Even rows start each cell at the left and end it at the right, odd
+        # rows the other way round, and the last cell in a row ends at the top
+        start_left = ys % 2 == 0
+        end_x = start_left.astype(np.int64)
+        end_y = xs == np.where(start_left, n_x - 1, 0)
+
+        # Where the hatching leaves off (always at the top), and the
+        # moves needed from there to the end of the cell
+        last_x = (start_left ^ (lines % 2 == 0)).astype(np.int64)
+        to_bottom = ~end_y
+        to_side = last_x != end_x
+
+        # Preallocate the whole path
+        n_hatch = 2 * lines
+        n_cell = n_hatch + to_bottom + to_side
+        cell_start = np.concatenate([[0], np.cumsum(n_cell)])
+        grid_path = np.empty((cell_start[-1], 2))
+
+        # Hatching, from the bottom up, alternating direction
+        cell = np.repeat(np.arange(len(lines)), n_hatch)
+        j = np.arange(len(cell)) - np.repeat(np.cumsum(n_hatch) - n_hatch, n_hatch)
+        i = j // 2
+        left = start_left[cell] ^ (i % 2 == 1)
+        k = cell_start[cell] + j
+        grid_path[k, 0] = np.where(left, j % 2, 1 - j % 2) + xs[cell]
+        grid_path[k, 1] = i / (lines[cell] - 1) + ys[cell]
+
+        # Down to the bottom of the cell, then across to its far side
+        k = (cell_start[:-1] + n_hatch)[to_bottom]
+        grid_path[k, 0] = (last_x + xs)[to_bottom]
+        grid_path[k, 1] = ys[to_bottom]
+        k = (cell_start[:-1] + n_hatch + to_bottom)[to_side]
+        grid_path[k, 0] = (end_x + xs)[to_side]
+        grid_path[k, 1] = (np.where(to_bottom, 0, 1) + ys)[to_side]
 
         if plot:
             import matplotlib.pyplot as plt
-            plt.figure()
-
-        for y in range(grid.shape[1]):
-
-            x_range = range(grid.shape[0]) if y % 2 == 0 else range(grid.shape[0]-1, -1, -1)
-            x_range = list(x_range)
-
-            for x in x_range:
-                end   = [1, 0] if y % 2 == 0 else [0, 0]
-                start = [0, 0] if y % 2 == 0 else [1, 0]
-
-                if x == x_range[-1]:
-                    # End of row
-                    end[1] = 1
-
-                c = CrossHatchSquare(start=start, end=end, lines=int(grid[x,y]))
 
-                c_path = np.array(c.path)
-                c_path[:, 0] += x
-                c_path[:, 1] += y
-                grid_path.extend(c_path)
-
-                if plot:
-                    CrossHatchSquare.plot_ch(c.path, offset=(x*1.1,y*1.1))
-
-        grid_path = np.array(grid_path)
+            # Each cell on its own (spread out a little), from green to red
+            plt.figure()
+            plt.gca().set_aspect(1.0)
+            point_cell = np.repeat(np.arange(len(lines)), n_cell)
+            spread = grid_path + 0.1 * np.column_stack([xs, ys])[point_cell]
+            in_cell = point_cell[1:] == point_cell[:-1]
+            plot_segments(route_segments(spread)[in_cell], color="black")
+            plt.scatter(spread[cell_start[:-1], 0], spread[cell_start[:-1], 1], color="green")
+            plt.scatter(spread[cell_start[1:] - 1, 0], spread[cell_start[1:] - 1, 1], color="red")
 
-        if plot:
             plt.figure()
-            for i in range(1, len(grid_path)):
-                plt.plot(grid_path[i-1:i+1, 0], grid_path[i-1:i+1, 1], color="black")
+            plot_route(grid_path, color="black")
 
         return grid_path
 
-def image_to_crosshatch_path(image: str, plot=False, downsampling: int = 1, max_hatch=10, save_as:str="img2cross.xy", rotate90=False):
+def downsample_mean(im: np.ndarray, downsampling: int) -> np.ndarray:
+    # Downsample a 2D image by averaging each downsampling x downsampling block of
+    # pixels (blocks at the far edges may be smaller). The result is the same
+    # shape as im[::downsampling, ::downsampling].
+    im = np.asarray(im, dtype=float)
+    if downsampling == 1:
+        return im
+    rows = np.arange(0, im.shape[0], downsampling)
+    cols = np.arange(0, im.shape[1], downsampling)
+    sums = np.add.reduceat(np.add.reduceat(im, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, im.shape[0])), np.diff(np.append(cols, im.shape[1])))
+    return sums / counts
+
+
+def _band_path(args) -> np.ndarray:
+    # Crosshatch one band of rows of a grid (in a worker process)
+    band, first_row = args
+    return CrossHatchSquare.crosshatch_grid_path(band, first_row=first_row)
+
+
+def iter_crosshatch_bands(grid: np.ndarray, band_rows: int = 64, workers: int = None) -> Iterable[np.ndarray]:
+    # Yield the crosshatch grid path of the grid a band of band_rows rows at a
+    # time, in drawing order, hatching the bands in a pool of worker processes.
+    # Joined together, they're the same as crosshatch_grid_path(grid).
+    grid = np.asarray(grid)
+    bands = [(grid[:, y:y + band_rows], y) for y in range(0, grid.shape[1], band_rows)]
+    if workers == 1 or len(bands) <= 1:
+        yield from map(_band_path, bands)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_band_path, bands)
+
+
+def image_to_crosshatch_path(image: str, plot=False, downsampling: int = 1, max_hatch=10, save_as:str="img2cross.xy",
+                             rotate90=False, area_average=True, band_rows: int = 64, workers: int = None):
     import imageio.v3 as iio
     import numpy as np
 
     im = iio.imread(image)
-    im = np.mean(im, axis=-1)
-    im /= max(im.flat)
-    im = im[::downsampling, ::downsampling]
+    if im.ndim == 3:
+        im = np.mean(im, axis=-1)
+    im = im / max(im.flat)
+    if area_average:
+        im = downsample_mean(im, downsampling)
+    else:
+        im = im[::downsampling, ::downsampling]
 
     if rotate90:
         im = im.T
 
-    path = CrossHatchSquare.crosshatch_grid_path((1.0-im)*max_hatch)
-
-    with open(save_as, "w") as f:
-        for p in path:
-            f.write(f"{p[0]}, {p[1]}\n")
+    # Hatch the image in bands of rows, writing each as it's done
+    bands = []
+    with RouteWriter(save_as) as writer:
+        for band in iter_crosshatch_bands((1.0-im)*max_hatch, band_rows=band_rows, workers=workers):
+            writer.write(band)
+            if plot:
+                bands.append(band)
     print("Image saved as "+save_as)
 
     if plot:
         import matplotlib.pyplot as plt
+        path = np.concatenate(bands)
         plt.figure()
         plt.imshow(-im, cmap="Greys")
         plt.figure()
-        plt.gca().set_aspect(1.0)
-        plt.plot(path[:, 0], path[:, 1], color="black")
+        plot_route(path, color="black")
         plt.show()
 
 if __name__ == "__main__":
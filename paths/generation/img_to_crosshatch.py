@@ -1,10 +1,22 @@
 from spider_printer.paths.generation.crosshatch import image_to_crosshatch_path
+from spider_printer.paths.cache import cached_file
 import sys
 
-path = image_to_crosshatch_path(
-    sys.argv[1], 
-    downsampling=int(input("Downsampling (integer): ")),
-    max_hatch=int(input("Maximum hatching (integer): ")),
-    rotate90=input("Would you like to rotate the source image by 90 degrees? y/n: ") == "y",
-    plot=input("Would you like to see the result now? y/n: ") == "y", 
-)
+# The hatching runs in worker processes, which (when spawned) import this
+# script again, so only prompt and hatch in the main process
+if __name__ == "__main__":
+    settings = dict(
+        downsampling=int(input("Downsampling (integer): ")),
+        max_hatch=int(input("Maximum hatching (integer): ")),
+        rotate90=input("Would you like to rotate the source image by 90 degrees? y/n: ") == "y",
+    )
+    plot = input("Would you like to see the result now? y/n: ") == "y"
+
+    # Reuse the route if this image has been hatched with these settings before
+    save_as = "img2cross.xy"
+    if cached_file(save_as, lambda f: image_to_crosshatch_path(sys.argv[1], save_as=f, plot=plot, **settings),
+                   "image_to_crosshatch_path", settings, files=[sys.argv[1]], code=[image_to_crosshatch_path]):
+        print(f"Image saved as {save_as} (from the cache)")
+        if plot:
+            from spider_printer.paths.generation.plot_xy import plot as plot_xy
+            plot_xy(save_as)
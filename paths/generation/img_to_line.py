@@ -1,53 +1,80 @@
-import imageio.v3 as iio
-import random
-import matplotlib.pyplot as plt
+from spider_printer.paths.preview import plot_route
+from spider_printer.paths.route import write_route
 import numpy as np
 import sys
 
-im = iio.imread(sys.argv[1])
-im = np.mean(im, axis=-1)
-im /= max(im.flat)
-im = 1-im
 
-# Increase contrast
-im = im ** float(sys.argv[2])
+def line_density(image: str, contrast: float = 1.0) -> np.ndarray:
+    # How much line each pixel of the image should get: its darkness,
+    # raised to the contrast exponent
+    import imageio.v3 as iio
+    im = iio.imread(image)
+    if im.ndim == 3:
+        im = np.mean(im, axis=-1)
+    im = 1 - im / max(im.flat)
 
-route = [(im.shape[0]//2, im.shape[1]//2)]
+    # Increase contrast
+    return im ** contrast
 
-iterations = 10000
-max_step = max(im.shape) // 30
 
-while len(route) < iterations:
+def image_to_line(density: np.ndarray, iterations: int = 10000, max_step: int = None,
+                  seed: int = None, batch_size: int = 65536) -> np.ndarray:
+    # A random walk over the pixels of the (H, W) density, which moves up to
+    # max_step pixels (by default 1/30 of the image) in each direction at a
+    # time, accepting each move with probability density[new] / density[current]
+    # (so the line spends its time in the dark parts of the image), until
+    # it has visited iterations points. Returns the (iterations, 2) route
+    # of (row, column) pixels.
+    density = np.asarray(density, dtype=float)
+    h, w = density.shape
+    if max_step is None:
+        max_step = max(density.shape) // 30
+    rng = np.random.default_rng(seed)
 
-    #move = (random.randint(-1, 1)*max_step, random.randint(-1, 1)*max_step)
-    #move = (random.randint(-2, 2)*max_step//2, random.randint(-2, 2)*max_step//2)
-    #move = [round(max_step*x) for x in (np.random.random(2) - 0.5)*2]
-    move = (random.randint(-max_step, max_step), random.randint(-max_step, max_step))
+    route = np.empty((iterations, 2), dtype=np.int64)
+    y, x = h // 2, w // 2
+    route[0] = y, x
+    values = density.ravel().tolist()
+    value = values[y * w + x]
+    n = 1
 
-    new = (route[-1][0] + move[0], route[-1][1] + move[1])
+    # Draw moves and acceptance thresholds a batch at a time, then walk through
+    # them in order - each move is from wherever the previous accepted move got
+    # to, so this is exactly the one-at-a-time walk
+    while n < iterations:
+        moves = rng.integers(-max_step, max_step + 1, (2, batch_size))
+        dys, dxs = moves.tolist()
+        thresholds = rng.random(batch_size).tolist()
 
-    new = (
-    min(max(new[0], 0), im.shape[0]-1),
-    min(max(new[1], 0), im.shape[1]-1)
-    )
+        for dy, dx, u in zip(dys, dxs, thresholds):
+            new_y = min(max(y + dy, 0), h - 1)
+            new_x = min(max(x + dx, 0), w - 1)
+            new_value = values[new_y * w + new_x]
 
-    p_accept = im[new] / im[route[-1]]
+            # Accept with probability new_value / value
+            if new_value > u * value:
+                y, x, value = new_y, new_x, new_value
+                route[n] = y, x
+                n += 1
+                if n == iterations:
+                    break
 
-    if p_accept > np.random.random():
-        route.append(new)
+    return route.astype(float)
 
-with open("image_line.xy", "w") as f:
-    for r in route:
-        f.write(f"{r[0]}, {r[1]}\n")
 
-ys, xs = np.array(route).T
-ys = [im.shape[0] - y - 1 for y in ys]
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
 
-plt.imshow(im, cmap="Greys")
+    im = line_density(sys.argv[1], contrast=float(sys.argv[2]))
+    route = image_to_line(im, iterations=int(sys.argv[3]) if len(sys.argv) > 3 else 10000)
+    write_route("image_line.xy", route)
 
-plt.figure()
-for i in range(1, len(xs)):
-    plt.plot(xs[i-1:i+1], ys[i-1:i+1], color="black", alpha=0.1)
-plt.gca().set_aspect(1.0)
+    ys, xs = route.T
+    ys = im.shape[0] - ys - 1
 
-plt.show()
+    plt.imshow(im, cmap="Greys")
+
+    plt.figure()
+    plot_route(np.column_stack([xs, ys]), color="black", alpha=0.1)
+
+    plt.show()
@@ -1,43 +1,40 @@
 #!/usr/bin/python3
+from spider_printer.paths.generation.mandelbrot import escape_time
+from spider_printer.paths.route import write_route
 import numpy as np
-import random
-from plot_xy import plot
-
-def mandel_iter(z):
-    f = 0.0
-    for n in range(100):
-        f = f**2 + z
-        if abs(f) > 2.0:
-            return n
-    return n
-
-path = [0.15 - 0.6j]
-
-x = path[-1]
-
-STEP_SIZE = 0.01
-RESCALE = 1 + STEP_SIZE
-ROTATE = STEP_SIZE
-
-dx = STEP_SIZE
-
-for n in range(10000):
-    #x += (np.random.random()*-0.5)*2*STEP_SIZE
-    #x += (np.random.random()*-0.5)*2*STEP_SIZE*1.0j
-
-    x += dx
-    dx *= np.exp(ROTATE*40.0j)
-
-    if mandel_iter(x) > 50:
-        x *= RESCALE
-    else:
-        x /= RESCALE
-
-    #x *= np.exp(ROTATE*1.0j)
-    path.append(x)
-
-path = np.array([[x.real, x.imag] for x in path])
-with open("mandel_walk.xy", "w") as f:
-    for p in path:
-        f.write(f"{p[0]}, {p[1]}\n")
-plot("mandel_walk.xy")
+import sys
+
+
+def mandel_walk(n_steps: int = 10000, start: complex = 0.15 - 0.6j, step_size: float = 0.01,
+                threshold: int = 50) -> np.ndarray:
+    # A walk that spirals along the edge of the Mandelbrot set: each step turns
+    # a little, then the walk is pushed outwards if it lands well inside the
+    # set (it takes more than threshold iterations to escape), and inwards
+    # otherwise. Returns the (n_steps + 1, 2) path.
+    rescale = 1 + step_size
+    rotate = complex(np.exp(step_size * 40.0j))
+    path = np.empty(n_steps + 1, dtype=complex)
+    path[0] = x = complex(start)
+    dx = complex(step_size)
+
+    # We only need to know whether each point escapes by the threshold,
+    # so don't iterate any further than that
+    for n in range(n_steps):
+        x += dx
+        dx *= rotate
+
+        if escape_time(x, max_iter=threshold + 2) > threshold:
+            x *= rescale
+        else:
+            x /= rescale
+
+        path[n + 1] = x
+
+    return np.column_stack([path.real, path.imag])
+
+
+if __name__ == "__main__":
+    from plot_xy import plot
+    path = mandel_walk(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
+    write_route("mandel_walk.xy", path)
+    plot("mandel_walk.xy")
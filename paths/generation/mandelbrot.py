@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def escape_time(z, max_iter: int = 100):
+    # The iteration (counting from 0) on which z escapes the Mandelbrot set
+    # (|f| > 2, iterating f = f^2 + z from f = 0), or max_iter - 1 if it
+    # doesn't within max_iter iterations. For an array of points, every point
+    # is iterated at once, dropping points as they escape.
+    if isinstance(z, (complex, float, int, np.number)):
+        z = complex(z)
+        f = 0j
+        for n in range(max_iter):
+            f = f * f + z
+            if abs(f) > 2.0:
+                return n
+        return max_iter - 1
+
+    z = np.asarray(z, dtype=complex)
+    n = np.full(z.shape, max_iter - 1, dtype=np.int64)
+    escapes = n.reshape(-1)
+    idx = np.arange(z.size)
+    c = z.reshape(-1)
+    f = np.zeros_like(c)
+    for i in range(max_iter):
+        f = f * f + c
+        escaped = f.real * f.real + f.imag * f.imag > 4.0
+        if escaped.any():
+            escapes[idx[escaped]] = i
+            idx, f, c = idx[~escaped], f[~escaped], c[~escaped]
+            if len(idx) == 0:
+                break
+    return n
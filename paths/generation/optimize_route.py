@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+# Reorder (and reverse) the strokes of a route to cut down the travel
+# between them, before drawing it with spider_path.py, e.g.
+#   optimize_route.py crosshatch.xy crosshatch_opt.xy [split distance]
+from spider_printer.paths.cache import cached_file
+from spider_printer.paths.optimize import optimize_route
+from spider_printer.paths.route import read_route, write_route
+import sys
+
+if len(sys.argv) < 3:
+    print("Arguments: input route, output route, [split distance]")
+    quit()
+
+split_distance = float(sys.argv[3]) if len(sys.argv) > 3 else None
+report = {}
+
+
+def optimize(fname):
+    route, r = optimize_route(read_route(sys.argv[1]), split_distance=split_distance)
+    write_route(fname, route)
+    report.update(r)
+
+
+# Reuse the optimized route if this route has been optimized before
+if cached_file(sys.argv[2], optimize, "optimize_route", {"split_distance": split_distance}, files=[sys.argv[1]],
+               code=[optimize_route]):
+    print(f"Saved {sys.argv[2]} (from the cache)")
+    quit()
+
+
+saved = report["travel_saved"] / report["travel_before"] * 100 if report["travel_before"] > 0 else 0.0
+print(f"Reordered {report['strokes']} strokes: travel {report['travel_before']:.6g} -> "
+      f"{report['travel_after']:.6g} (saved {report['travel_saved']:.6g}, {saved:.1f}%)")
@@ -1,16 +1,11 @@
+from spider_printer.paths.preview import plot_route
+from spider_printer.paths.route import read_route
 import matplotlib.pyplot as plt
 import sys
 
 def plot(fname):
 
-    data = []
-    with open(fname) as f:
-        for line in f:
-            data.append([float(x) for x in line.split(",")])
-
-    x, y = zip(*data)
-    plt.plot(x,y,color="black")
-    plt.gca().set_aspect(1.0)
+    plot_route(read_route(fname), color="black")
     plt.show()
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+#!/usr/bin/python3
+# Save a picture of a route as a PNG, without matplotlib, e.g.
+#   preview_route.py img2cross.xy img2cross.png [width in pixels]
+from spider_printer.paths.preview import save_preview
+from spider_printer.paths.route import read_route
+import sys
+
+if len(sys.argv) < 3:
+    print("Arguments: route, output png, [width]")
+    quit()
+
+width, height = save_preview(read_route(sys.argv[1]), sys.argv[2], width=int(sys.argv[3]) if len(sys.argv) > 3 else 1000)
+print(f"Saved a {width}x{height} preview as {sys.argv[2]}")
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 from spider_printer.paths.generation.crosshatch import CrossHatchSquare
+from spider_printer.paths.route import write_route
 from plot_xy import plot
 import sys
 import numpy as np
@@ -8,8 +9,6 @@ size = int(input("Size (integer): "))
 max_hatch = int(input("Max hatch (integer): "))
 
 path = CrossHatchSquare.crosshatch_grid_path(np.random.random((size, size))*max_hatch)
-with open("rand_crosshatch.xy", "w") as f:
-    for p in path:
-        f.write(f"{p[0]}, {p[1]}\n")
+write_route("rand_crosshatch.xy", path)
 
 plot("rand_crosshatch.xy")
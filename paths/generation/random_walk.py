@@ -1,41 +1,128 @@
 #!/usr/bin/python3
+from spider_printer.paths.route import RouteWriter
 import numpy as np
-import random
-from plot_xy import plot
-
-path = [[0,0]]
-
-max_d = 20
-hits = [False]*4
-
-while True:
-    
-    x, y = path[-1]
-    x += random.randint(-1,1)
-    y += random.randint(-1,1)
-
-    if x >  max_d: 
-        x = max_d
-        hits[0] = True
-    if x < -max_d: 
-        x = -max_d
-        hits[1] = True
-    if y >  max_d: 
-        y = max_d
-        hits[2] = True
-    if y < -max_d: 
-        y = -max_d
-        hits[3] = True
-
-    path.append([x,y])
-
-    if x == 0 and y == 0 and all(hits):
-        break
-
-path = np.array(path, dtype=float)
-path /= max_d
-
-with open("rw.xy", "w") as f:
-    for p in path:
-        f.write(f"{p[0]}, {p[1]}\n")
-plot("rw.xy")
+from typing import Iterator
+import sys
+
+
+# Boxes small enough to cross every couple of hundred steps, which are quicker
+# to walk one step at a time (see benchmarks/bench_random_walk.py)
+SMALL_BOX = 7
+
+
+def _step_clamped_walk(x: int, steps: np.ndarray, max_d: int):
+    # clamped_walk, one step at a time
+    positions, hit_top, hit_bottom = [], [], []
+    for i, s in enumerate(steps.tolist()):
+        x += s
+        if x > max_d:
+            x = max_d
+            hit_top.append(i)
+        elif x < -max_d:
+            x = -max_d
+            hit_bottom.append(i)
+        positions.append(x)
+    return (np.array(positions, dtype=np.int64),
+            np.array(hit_top, dtype=np.int64), np.array(hit_bottom, dtype=np.int64))
+
+
+def clamped_walk(start: int, steps: np.ndarray, max_d: int, window: int = None):
+    # Positions of a 1D walk from start taking the given steps, clamped to
+    # [-max_d, max_d]. Returns the positions, and the indices of the steps
+    # that hit the top and bottom walls.
+    #
+    # Clamped at only one wall, the walk is the free walk (a cumulative sum)
+    # pushed back by the furthest it has gone past that wall so far, e.g.
+    #   x[k] = walk[k] + max(0, max(-max_d - walk[:k + 1]))
+    # at the bottom. That holds until it first goes past the other wall,
+    # when the other wall takes over. So however often the walk bumps into
+    # a wall, it's only restarted each time it crosses from one wall to the
+    # other, which takes ~max_d^2 steps (windows of steps are summed at once
+    # to avoid summing all of them again after each crossing).
+    if max_d < SMALL_BOX:
+        return _step_clamped_walk(start, steps, max_d)
+    window = window or 8 * max_d * max_d
+    positions = np.empty(len(steps), dtype=np.int64)
+    hits = {1: [], -1: []}  # Step indices that hit the top (1) and bottom (-1)
+    wall = -1  # The wall clamping the walk
+    i = 0
+    while i < len(steps):
+        window_steps = steps[i:i + window]
+        walk = start + np.cumsum(window_steps)
+        if wall < 0:
+            walk += np.maximum(np.maximum.accumulate(-max_d - walk), 0)
+            out = np.flatnonzero(walk > max_d)
+        else:
+            walk -= np.maximum(np.maximum.accumulate(walk - max_d), 0)
+            out = np.flatnonzero(walk < -max_d)
+        j = out[0] if len(out) > 0 else len(walk)
+
+        # Steps (before the crossing) that would have gone past the clamping wall
+        before = np.concatenate([[start], walk[:j]])[:j]
+        past = (before + window_steps[:j]) * wall > max_d
+        hits[wall].append(i + np.flatnonzero(past))
+        positions[i:i + j] = walk[:j]
+
+        if j == len(walk):
+            start = walk[-1]
+            i += j
+            continue
+
+        # Crossing to the other wall, which it hits
+        wall = -wall
+        start = positions[i + j] = wall * max_d
+        hits[wall].append(np.array([i + j]))
+        i += j + 1
+
+    hit_top, hit_bottom = (np.concatenate(hits[w] + [np.zeros(0, dtype=np.int64)]).astype(np.int64) for w in (1, -1))
+    return positions, hit_top, hit_bottom
+
+
+def iter_random_walk(max_d: int = 20, max_points: int = None, chunk_size: int = 65536,
+                     seed: int = None) -> Iterator[np.ndarray]:
+    # A random walk (moving -1, 0 or 1 in x and y at each step) from the origin,
+    # clamped to the box |x|, |y| <= max_d, which stops when it gets back to the
+    # origin after having hit all four walls (or after max_points points).
+    # Yields the (n, 2) points, scaled to the unit box, a chunk at a time.
+    rng = np.random.default_rng(seed)
+    yield np.zeros((1, 2))
+    n = 1
+
+    x = y = 0
+    first_hits = np.full(4, np.inf)  # The first step that hit each wall
+    while max_points is None or n < max_points:
+        size = chunk_size if max_points is None else min(chunk_size, max_points - n)
+        steps = rng.integers(-1, 2, (2, size))
+        xs, *x_hits = clamped_walk(x, steps[0], max_d)
+        ys, *y_hits = clamped_walk(y, steps[1], max_d)
+        x, y = xs[-1], ys[-1]
+
+        for wall, hits in enumerate(x_hits + y_hits):
+            if len(hits) > 0:
+                first_hits[wall] = min(first_hits[wall], n + hits[0])
+
+        # Back at the origin, once all the walls have been hit
+        home = np.flatnonzero((xs == 0) & (ys == 0) & (np.arange(n, n + size) >= np.max(first_hits)))
+        if len(home) > 0:
+            size = home[0] + 1
+
+        yield np.column_stack([xs[:size], ys[:size]]) / max_d
+        n += size
+        if len(home) > 0:
+            return
+
+
+def random_walk(max_d: int = 20, max_points: int = None, seed: int = None) -> np.ndarray:
+    # The whole (N, 2) walk from iter_random_walk
+    return np.concatenate(list(iter_random_walk(max_d, max_points=max_points, seed=seed)))
+
+
+if __name__ == "__main__":
+    from plot_xy import plot
+
+    # Write the walk as it's made, stopping after the (optional) maximum points
+    with RouteWriter("rw.xy") as writer:
+        for chunk in iter_random_walk(max_points=int(sys.argv[1]) if len(sys.argv) > 1 else None):
+            writer.write(chunk)
+    print(f"Walked {writer.points} points")
+    plot("rw.xy")
@@ -1,70 +1,123 @@
 #!/usr/bin/python3
+from spider_printer.paths.cache import cached_route
+from spider_printer.paths.route import write_route
 import numpy as np
 import random
-from plot_xy import plot
 import sys
 
-# Parameters
-grid_size = int(sys.argv[1])
-density = float(sys.argv[2])
-self_inter_prob = 0.1
-smooth = 0.5
-edge_bias = 0.0
-boundary = ["circle", "square"][0]
+# Neighbouring grid squares, in the order they're considered
+MOVES = ((-1, 0), (1, 0), (0, 1), (0, -1))
+BOUNDARIES = ("circle", "square")
 
-# Taken grid squares
-grid = np.full((grid_size, grid_size), False)
 
-if boundary == "circle":
-    def in_range(x,y):
+def boundary_mask(grid_size: int, boundary: str = "circle") -> np.ndarray:
+    # The (grid_size + 2, grid_size + 2) grid squares the walk may visit,
+    # with a border of one square (never allowed) all round, so every
+    # allowed square has four neighbours in the mask
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"Unknown boundary {boundary!r}, expected one of {BOUNDARIES}")
+    x, y = np.ogrid[-1:grid_size + 1, -1:grid_size + 1]
+    if boundary == "circle":
         r = grid_size // 2
-        dx = x - r
-        dy = y - r
-        return dx*dx + dy*dy < r * r
+        return (x - r) ** 2 + (y - r) ** 2 < r * r
+    return (x >= 0) & (x < grid_size) & (y >= 0) & (y < grid_size)
 
-if boundary == "square":
-    def in_range(x,y):
-        if x < 0: return False
-        if y < 0: return False
-        if x >= grid_size: return False
-        if y >= grid_size: return False
-        return True
 
-def taken(x,y):
-    if not in_range(x,y): return True
-    return grid[x,y]
+def smooth_path(path: np.ndarray, smooth: float = 0.5) -> np.ndarray:
+    # Smooth the (N, d) path, moving each point (but the ends) towards its
+    # neighbours, as the running average
+    #   path[i] = (1 - smooth)*path[i] + (smooth/2)*(path[i-1] + path[i+1])
+    # where path[i-1] has already been smoothed. That makes it a first
+    # order recursive filter, y[i] = a*y[i-1] + u[i] with a = smooth/2,
+    # which is evaluated as the sum of its impulse response, truncated
+    # once a^k is too small to make any difference.
+    path = np.asarray(path, dtype=float)
+    if len(path) < 3 or smooth == 0:
+        return path.copy()
+    a = smooth / 2
+    u = np.empty_like(path)
+    u[0] = path[0]
+    u[1:-1] = (1 - smooth) * path[1:-1] + a * path[2:]
 
-# Allowed moves/initial path point
-moves = [[-1, 0], [1, 0], [0, 1], [0, -1]]
-path = [[i//2 for i in grid.shape]]
+    smoothed = u.copy()
+    weight = 1.0
+    for k in range(1, len(path) - 1):
+        weight *= a
+        if weight < 1e-18:
+            break
+        smoothed[k:-1] += weight * u[:-1 - k]
+    smoothed[-1] = path[-1]
+    return smoothed
 
-while len(path) < grid.shape[0]*grid.shape[1]*density:
 
-    xy = [[path[-1][0]+m[0], path[-1][1]+m[1]] for m in moves]
-    free = [c for c in xy if not taken(*c)]
+def self_avoiding_random_walk(grid_size: int, density: float, smooth: float = 0.5, edge_bias: float = 0.0,
+                              boundary: str = "circle", seed: int = None) -> np.ndarray:
+    # A random walk on a grid that never steps onto a square it's already
+    # visited, unless it's boxed in (when it steps onto any neighbouring
+    # square within the boundary), until it has grid_size^2 * density
+    # points. With edge_bias, each step back towards the start is rejected
+    # with that probability. Returns the smoothed (N, 2) path.
+    rng = random.Random(seed)
+    width = grid_size + 2
+    allowed = boundary_mask(grid_size, boundary)
 
-    if len(free) == 0:
-        free = [c for c in xy if in_range(*c)]
+    # Which squares are taken (or out of bounds), and which are in
+    # bounds, one bit per square of the flattened (bordered) grid
+    taken = bytearray(np.packbits(~allowed.ravel(), bitorder="little").tobytes())
+    in_range = bytearray(np.packbits(allowed.ravel(), bitorder="little").tobytes())
+    offsets = [dx * width + dy for dx, dy in MOVES]
 
-    i = random.randint(0, len(free)-1)
-    c = free[i]
+    n_points = max(1, int(np.ceil(grid_size * grid_size * density)))
+    path = np.empty(n_points, dtype=np.int64)
+    start = (grid_size // 2 + 1) * width + (grid_size // 2 + 1)
+    start_x, start_y = divmod(start, width)
+    path[0] = current = start
 
-    if edge_bias > 1e-5:
-        if np.linalg.norm(np.array(c) - np.array(path[0])) < np.linalg.norm(np.array(path[-1]) - np.array(path[0])):
-            if np.random.random() > 1-edge_bias:
-                continue
+    n = 1
+    while n < n_points:
+        neighbours = [current + o for o in offsets]
+        free = [c for c in neighbours if not (taken[c >> 3] >> (c & 7)) & 1]
+        if len(free) == 0:
+            free = [c for c in neighbours if (in_range[c >> 3] >> (c & 7)) & 1]
 
-    grid[c[0], c[1]] = True
-    path.append(c)
+        c = free[int(rng.random() * len(free))]
 
-path = np.array(path, dtype=float)
+        if edge_bias > 1e-5:
+            # Compare squared distances from the start
+            cx, cy = divmod(c, width)
+            px, py = divmod(current, width)
+            if (cx - start_x) ** 2 + (cy - start_y) ** 2 < (px - start_x) ** 2 + (py - start_y) ** 2:
+                if rng.random() > 1 - edge_bias:
+                    continue
 
-# smoothing
-f = 1-smooth
-for i in range(1, len(path)-1):
-    path[i] = f*path[i]+(smooth/2)*path[i-1]+(smooth/2)*path[i+1]
+        taken[c >> 3] |= 1 << (c & 7)
+        path[n] = current = c
+        n += 1
 
-with open("sarw.xy", "w") as f:
-    for p in path:
-        f.write(f"{p[0]}, {p[1]}\n")
-plot("sarw.xy")
+    x, y = np.divmod(path, width)
+    return smooth_path(np.column_stack([x - 1, y - 1]), smooth)
+
+
+if __name__ == "__main__":
+    from plot_xy import plot
+
+    if len(sys.argv) < 3:
+        print("Arguments: grid size, density, [seed]")
+        quit()
+
+    # Parameters (with a new seed each time, unless one is given to
+    # make the same walk again)
+    params = dict(
+        grid_size=int(sys.argv[1]),
+        density=float(sys.argv[2]),
+        smooth=0.5,
+        edge_bias=0.0,
+        boundary=["circle", "square"][0],
+        seed=int(sys.argv[3]) if len(sys.argv) > 3 else random.randrange(2 ** 32),
+    )
+    print(f"Seed: {params['seed']}")
+
+    # Reuse the walk if it's been made with these parameters (and seed) before
+    path = cached_route(lambda: self_avoiding_random_walk(**params), "self_avoiding_random_walk", params)
+    write_route("sarw.xy", path)
+    plot("sarw.xy")
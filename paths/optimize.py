@@ -0,0 +1,174 @@
+import numpy as np
+from typing import List, Tuple
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+
+def split_strokes(route: np.ndarray, split_distance: float = None) -> List[Tuple[int, int]]:
+    # Split an (N, 2) route into strokes at every jump longer than
+    # split_distance (by default, five times the median step), returning
+    # the [start, end) index range of each stroke
+    route = np.asarray(route, dtype=float)
+    if len(route) < 2:
+        return [(0, len(route))]
+
+    steps = np.linalg.norm(np.diff(route, axis=0), axis=1)
+    if split_distance is None:
+        split_distance = 5 * np.median(steps)
+
+    breaks = np.flatnonzero(steps > split_distance) + 1
+    bounds = np.concatenate([[0], breaks, [len(route)]])
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def travel_distance(starts: np.ndarray, ends: np.ndarray, origin: np.ndarray = None) -> float:
+    # Distance moved between strokes, drawn in order, with the given (n, 2)
+    # start and end points (plus from the origin to the first, if given)
+    travel = np.sum(np.linalg.norm(starts[1:] - ends[:-1], axis=1))
+    if origin is not None and len(starts) > 0:
+        travel += np.linalg.norm(starts[0] - origin)
+    return float(travel)
+
+
+def nearest_neighbour_order(starts: np.ndarray, ends: np.ndarray, origin: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Greedily order strokes, always moving to the nearest end of a stroke not yet
+    # drawn (drawing it backwards if that's its nearest end). Returns the order
+    # of the strokes and whether each (in the new order) is reversed.
+    n = len(starts)
+    points = np.vstack([starts, ends])  # Point i < n starts stroke i, point n + i ends it
+    used = np.zeros(n, dtype=bool)
+    order = np.zeros(n, dtype=np.int64)
+    reversed_ = np.zeros(n, dtype=bool)
+    tree = cKDTree(points) if cKDTree is not None else None
+
+    position = np.asarray(origin, dtype=float)
+    for k in range(n):
+        if tree is not None:
+            # Look at more and more neighbours until we find an unused stroke
+            n_query = 8
+            while True:
+                dist, idx = tree.query(position, k=min(n_query, 2 * n))
+                idx = np.atleast_1d(idx)
+                free = idx[~used[idx % n]]
+                if len(free) > 0 or n_query >= 2 * n:
+                    break
+                n_query *= 4
+            best = free[0]
+        else:
+            dist = np.sum((points - position) ** 2, axis=1)
+            dist[np.concatenate([used, used])] = np.inf
+            best = np.argmin(dist)
+
+        stroke = best % n
+        order[k] = stroke
+        reversed_[k] = best >= n
+        used[stroke] = True
+        position = starts[stroke] if reversed_[k] else ends[stroke]
+
+    return order, reversed_
+
+
+def two_opt(starts: np.ndarray, ends: np.ndarray, origin: np.ndarray, max_passes: int = 10,
+            neighbours: int = 16) -> Tuple[np.ndarray, np.ndarray]:
+    # Improve the order of the (already ordered and oriented) strokes by reversing
+    # runs of strokes (which also reverses each stroke in the run) while that
+    # shortens the travel. Returns the new order and which strokes are reversed.
+    # With a KD-tree, only runs ending at one of the given number of nearest
+    # stroke ends are tried, otherwise every run is.
+    starts = np.array(starts, dtype=float)
+    ends = np.array(ends, dtype=float)
+    n = len(starts)
+    order = np.arange(n)
+    reversed_ = np.zeros(n, dtype=bool)
+    where = np.arange(n)  # Where each (original) stroke is in the order
+
+    nearest = None
+    if cKDTree is not None and n > neighbours:
+        # The nearest stroke ends to each stroke end (point i < n starts
+        # stroke i, point n + i ends it), which don't change as we reorder
+        points = np.vstack([starts, ends])
+        tree = cKDTree(points)
+        nearest = tree.query(points, k=neighbours + 1)[1][:, 1:] % n
+        nearest_origin = tree.query(origin, k=neighbours)[1] % n
+
+    for p in range(max_passes):
+        improved = False
+        for i in range(n - 1):
+            # Reversing strokes i..j swaps the joins (end[i-1] -> start[i]) and
+            # (end[j] -> start[j+1]) for (end[i-1] -> end[j]) and (start[i] -> start[j+1])
+            before = ends[i - 1] if i > 0 else origin
+            if nearest is None:
+                j = np.arange(i + 1, n)
+            else:
+                # The point before strokes i..j is the end of stroke i - 1, as drawn
+                near = nearest_origin if i == 0 else nearest[order[i - 1] + (0 if reversed_[i - 1] else n)]
+                j = where[near]
+                j = j[j > i]
+                if len(j) == 0:
+                    continue
+            after = np.vstack([starts[1:], np.full((1, 2), np.nan)])[j]
+            old = np.linalg.norm(starts[i] - before) + np.nan_to_num(np.linalg.norm(after - ends[j], axis=1))
+            new = np.linalg.norm(ends[j] - before, axis=1) + np.nan_to_num(np.linalg.norm(after - starts[i], axis=1))
+            gain = old - new
+            best = np.argmax(gain)
+            if gain[best] <= 1e-12:
+                continue
+
+            # Reverse the run of strokes (and each stroke within it)
+            j = j[best]
+            starts[i:j + 1], ends[i:j + 1] = ends[i:j + 1][::-1].copy(), starts[i:j + 1][::-1].copy()
+            order[i:j + 1] = order[i:j + 1][::-1].copy()
+            reversed_[i:j + 1] = ~reversed_[i:j + 1][::-1]
+            where[order[i:j + 1]] = np.arange(i, j + 1)
+            improved = True
+
+        if not improved:
+            break
+
+    return order, reversed_
+
+
+def optimize_route(route: np.ndarray, split_distance: float = None, origin=None,
+                   use_two_opt: bool = True, max_passes: int = 10) -> Tuple[np.ndarray, dict]:
+    # Reorder (and reverse) the strokes of an (N, 2) route to reduce the distance
+    # travelled between them, starting from origin (by default the first point
+    # of the route). Returns the optimized route and a report of the savings.
+    route = np.asarray(route, dtype=float)
+    if len(route) == 0:
+        return route.copy(), {"strokes": 0, "travel_before": 0.0, "travel_after": 0.0, "travel_saved": 0.0}
+    strokes = split_strokes(route, split_distance)
+    origin = route[0] if origin is None else np.asarray(origin, dtype=float)
+
+    starts = np.array([route[a] for a, b in strokes])
+    ends = np.array([route[b - 1] for a, b in strokes])
+    travel_before = travel_distance(starts, ends, origin)
+
+    # Order greedily, then improve with 2-opt
+    order, reversed_ = nearest_neighbour_order(starts, ends, origin)
+    starts_nn = np.where(reversed_[:, None], ends[order], starts[order])
+    ends_nn = np.where(reversed_[:, None], starts[order], ends[order])
+    if use_two_opt:
+        order_2opt, reversed_2opt = two_opt(starts_nn, ends_nn, origin, max_passes=max_passes)
+        order = order[order_2opt]
+        reversed_ = reversed_[order_2opt] ^ reversed_2opt
+
+    # Assemble the new route
+    pieces = []
+    for stroke, rev in zip(order, reversed_):
+        a, b = strokes[stroke]
+        pieces.append(route[a:b][::-1] if rev else route[a:b])
+    optimized = np.concatenate(pieces) if pieces else route.copy()
+
+    new_starts = np.array([p[0] for p in pieces])
+    new_ends = np.array([p[-1] for p in pieces])
+    travel_after = travel_distance(new_starts, new_ends, origin)
+
+    return optimized, {
+        "strokes": len(strokes),
+        "travel_before": travel_before,
+        "travel_after": travel_after,
+        "travel_saved": travel_before - travel_after,
+    }
@@ -0,0 +1,169 @@
+import numpy as np
+import struct
+import zlib
+from typing import Tuple
+
+# Most segments drawn at once by plot_route (the rest of the route is
+# decimated down to this, redone whenever the view changes)
+MAX_SEGMENTS = 25_000
+
+# Tallest image rasterize makes, relative to its width (e.g. for a vertical line)
+MAX_ASPECT = 10
+
+
+def route_segments(route: np.ndarray) -> np.ndarray:
+    # The (N - 1, 2, 2) segments joining the points of an (N, 2) route
+    route = np.asarray(route, dtype=float)[:, :2]
+    return np.stack([route[:-1], route[1:]], axis=1)
+
+
+def decimate(route: np.ndarray, view=None, pixel: float = 0.0, max_segments: int = MAX_SEGMENTS) -> np.ndarray:
+    # The segments of an (N, 2) route worth drawing in the given view,
+    # ((x min, x max), (y min, y max)), in which a pixel is the given size.
+    # Segments outside the view are dropped, runs of points within the
+    # same pixel are merged, and if that still leaves more than
+    # max_segments, only every few points are kept.
+    route = np.asarray(route, dtype=float)[:, :2]
+    if len(route) < 2:
+        return np.zeros((0, 2, 2))
+
+    if view is None:
+        visible = np.ones(len(route) - 1, dtype=bool)
+    else:
+        (x_min, x_max), (y_min, y_max) = view
+        a, b = route[:-1], route[1:]
+        visible = ((np.maximum(a[:, 0], b[:, 0]) >= x_min) & (np.minimum(a[:, 0], b[:, 0]) <= x_max) &
+                   (np.maximum(a[:, 1], b[:, 1]) >= y_min) & (np.minimum(a[:, 1], b[:, 1]) <= y_max))
+
+    # Keep the first point in each pixel, and the ends of every visible run
+    keep = np.zeros(len(route), dtype=bool)
+    if pixel > 0:
+        cells = np.floor(route / pixel)
+        keep[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+    else:
+        keep[:] = True
+    before = np.concatenate([[False], visible[:-1]])
+    after = np.concatenate([visible[1:], [False]])
+    keep[:-1] |= visible & ~before
+    keep[1:] |= visible & ~after
+    keep[[0, -1]] = True
+
+    idx = np.flatnonzero(keep)
+    n_visible = np.count_nonzero(visible[idx[:-1]] | visible[idx[1:] - 1])
+    if n_visible > max_segments:
+        idx = np.unique(np.concatenate([idx[::int(np.ceil(n_visible / max_segments))], idx[-1:]]))
+
+    # Segments between kept points, where the route between them is visible
+    # (checking the segments at either end of the gap)
+    shown = visible[idx[:-1]] | visible[idx[1:] - 1]
+    return np.stack([route[idx[:-1]][shown], route[idx[1:]][shown]], axis=1)
+
+
+def plot_segments(segments: np.ndarray, ax=None, **kwargs):
+    # Draw (n, 2, 2) segments as a single LineCollection (one artist, however
+    # many segments), taking the usual line keyword arguments
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    ax = ax or plt.gca()
+    kwargs.setdefault("color", "black")
+    collection = LineCollection(segments, **kwargs)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
+
+
+def plot_route(route: np.ndarray, ax=None, max_segments: int = MAX_SEGMENTS, **kwargs):
+    # Draw an (N, 2) route as a single LineCollection, redrawing only the
+    # visible segments, at the resolution of the screen, whenever the view
+    # is zoomed or panned (see decimate)
+    import matplotlib.pyplot as plt
+    ax = ax or plt.gca()
+    route = np.asarray(route, dtype=float)[:, :2]
+    ax.set_aspect(1.0)
+
+    def view_segments():
+        x_lim, y_lim = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+        pixel = (x_lim[1] - x_lim[0]) / max(ax.bbox.width, 1)
+        return decimate(route, view=(x_lim, y_lim), pixel=pixel, max_segments=max_segments)
+
+    collection = plot_segments(np.zeros((0, 2, 2)), ax=ax, **kwargs)
+    if len(route) > 0:
+        (x_min, y_min), (x_max, y_max) = np.min(route, axis=0), np.max(route, axis=0)
+        ax.update_datalim([(x_min, y_min), (x_max, y_max)])
+        ax.autoscale_view()
+    collection.set_segments(view_segments())
+
+    def update(_):
+        collection.set_segments(view_segments())
+
+    ax.callbacks.connect("xlim_changed", update)
+    ax.callbacks.connect("ylim_changed", update)
+    return collection
+
+
+def rasterize(route: np.ndarray, width: int = 1000, height: int = None, alpha: float = 1.0,
+              bounds=None) -> np.ndarray:
+    # Render an (N, 2) route as a (height, width) greyscale image (black
+    # lines on white), y upwards, fitting the bounds ((x min, y min),
+    # (x max, y max)) of the route to the image. Each segment is sampled
+    # at least once per pixel, and each sample darkens its pixel by alpha.
+    # An empty route is a blank (square, unless height is given) image.
+    route = np.asarray(route, dtype=float)
+    if len(route) == 0:
+        return np.full((height or width, width), 255, dtype=np.uint8)
+    route = route[:, :2]
+    if bounds is None:
+        bounds = np.min(route, axis=0), np.max(route, axis=0)
+    lo, hi = np.asarray(bounds, dtype=float)
+    size = np.maximum(hi - lo, 0.0)
+    if height is None:
+        aspect = size[1] / size[0] if size[0] > 0 else (MAX_ASPECT if size[1] > 0 else 1.0)
+        height = int(np.clip(round(width * aspect), 1, MAX_ASPECT * width))
+
+    # Fit the axes that span more than a pixel (a straight line, or a
+    # single point, is flat along one or both), centred in the image
+    pixels = np.array([width - 1, height - 1], dtype=float)
+    spans = (size > 0) & (pixels > 0)
+    scale = np.min(pixels[spans] / size[spans]) if np.any(spans) else 0.0
+    points = (route - lo) * scale + np.maximum(pixels - size * scale, 0) / 2
+
+    # Sample every segment at (at least) one pixel spacing, and round the
+    # samples (which are all >= 0) to their pixels, with row 0 at the top
+    x, y = points[:, 0], points[:, 1]
+    dx, dy = np.diff(x), np.diff(y)
+    n_samples = np.maximum(np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64), 1)
+    t = np.arange(np.sum(n_samples), dtype=float)
+    t -= np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+    t /= np.repeat(n_samples, n_samples)
+    cols = np.append((np.repeat(x[:-1], n_samples) + t * np.repeat(dx, n_samples) + 0.5).astype(np.int64),
+                     int(x[-1] + 0.5))
+    rows = np.append((np.repeat(y[:-1], n_samples) + t * np.repeat(dy, n_samples) + 0.5).astype(np.int64),
+                     int(y[-1] + 0.5))
+    pixels = (height - 1 - np.clip(rows, 0, height - 1)) * width + np.clip(cols, 0, width - 1)
+    counts = np.bincount(pixels, minlength=width * height).reshape(height, width)
+    return np.rint(255 * (1.0 - alpha) ** counts).astype(np.uint8)
+
+
+def write_png(fname: str, image: np.ndarray):
+    # Write an (H, W) uint8 greyscale image as a PNG
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    # Each row starts with its filter type (0, none)
+    rows = np.hstack([np.zeros((height, 1), dtype=np.uint8), image])
+    with open(fname, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def save_preview(route: np.ndarray, fname: str, width: int = 1000, alpha: float = 1.0) -> Tuple[int, int]:
+    # Rasterize an (N, 2) route (see rasterize) and save it as a PNG,
+    # returning the (width, height) of the image
+    image = rasterize(route, width=width, alpha=alpha)
+    write_png(fname, image)
+    return image.shape[1], image.shape[0]
@@ -0,0 +1,202 @@
+import itertools
+import numpy as np
+import os
+import struct
+from typing import Iterator, Tuple
+
+# Binary routes (.xyb) are a fixed-size header followed by the (N, 2) points
+# as little-endian floats, so they can be memory-mapped straight into an
+# array. The header also holds the bounding box, so it needn't be recomputed.
+#   magic, version, bytes per float, n points, x min, y min, x max, y max
+BINARY_EXTENSION = ".xyb"
+HEADER = struct.Struct("<8sHBxQ4d")
+HEADER_SIZE = 64
+MAGIC = b"SPIDERXY"
+VERSION = 1
+DTYPES = {4: np.dtype("<f4"), 8: np.dtype("<f8")}
+
+# Format for points in text (.xy) routes
+XY_FORMAT = "%.15g"
+
+
+def is_binary_route(fname: str) -> bool:
+    return os.fspath(fname).endswith(BINARY_EXTENSION)
+
+
+def read_xy(fname: str) -> np.ndarray:
+    # Read an (N, 2) route from a text file with one "x, y" point per line
+    return np.loadtxt(fname, delimiter=",", dtype=float, ndmin=2).reshape(-1, 2)
+
+
+def write_xy(fname: str, route: np.ndarray):
+    # Write an (N, 2) route as a text file with one "x, y" point per line
+    np.savetxt(fname, np.asarray(route, dtype=float).reshape(-1, 2), fmt=XY_FORMAT, delimiter=", ")
+
+
+def read_header(fname: str) -> dict:
+    # Read the header of a binary route
+    with open(fname, "rb") as f:
+        magic, version, float_size, n, x_min, y_min, x_max, y_max = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{fname} is not a binary route file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary route version {version} in {fname}")
+    if float_size not in DTYPES:
+        raise ValueError(f"Unsupported float size {float_size} in {fname}")
+    return {"dtype": DTYPES[float_size], "points": n, "bounds": ((x_min, y_min), (x_max, y_max))}
+
+
+def read_binary(fname: str, mmap: bool = True) -> np.ndarray:
+    # Read an (N, 2) binary route, memory-mapped (read only) unless mmap is False
+    header = read_header(fname)
+    if header["points"] == 0:
+        return np.zeros((0, 2), dtype=header["dtype"])
+    if mmap:
+        return np.memmap(fname, dtype=header["dtype"], mode="r", offset=HEADER_SIZE, shape=(header["points"], 2))
+    with open(fname, "rb") as f:
+        f.seek(HEADER_SIZE)
+        return np.fromfile(f, dtype=header["dtype"], count=2 * header["points"]).reshape(-1, 2)
+
+
+def write_binary(fname: str, route: np.ndarray, dtype=np.float64):
+    # Write an (N, 2) route as a binary route file
+    with RouteWriter(fname, dtype=dtype) as writer:
+        writer.write(route)
+
+
+def read_route(fname: str, mmap: bool = True) -> np.ndarray:
+    # Read an (N, 2) route from either a binary or text route file
+    if is_binary_route(fname):
+        return read_binary(fname, mmap=mmap)
+    return read_xy(fname)
+
+
+def write_route(fname: str, route: np.ndarray, dtype=np.float64):
+    # Write an (N, 2) route to either a binary or text route file (by extension)
+    if is_binary_route(fname):
+        write_binary(fname, route, dtype=dtype)
+    else:
+        write_xy(fname, route)
+
+
+def route_bounds(route: np.ndarray) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    # ((x min, y min), (x max, y max)) of an (N, 2) route
+    route = np.asarray(route)
+    return tuple(np.min(route, axis=0).tolist()), tuple(np.max(route, axis=0).tolist())
+
+
+class RouteWriter:
+
+    def __init__(self, fname: str, dtype=np.float64):
+        # Writes a route a chunk at a time, to either a binary or a text file
+        self._fname = fname
+        self._binary = is_binary_route(fname)
+        self._dtype = np.dtype(dtype).newbyteorder("<")
+        assert self._dtype.itemsize in DTYPES, f"Unsupported route dtype {dtype}"
+        self._n = 0
+        self._min = np.full(2, np.inf)
+        self._max = np.full(2, -np.inf)
+
+        self._file = open(fname, "wb" if self._binary else "w")
+        if self._binary:
+            self._file.write(b"\0" * HEADER_SIZE)  # Written properly on close
+
+    @property
+    def points(self) -> int:
+        return self._n
+
+    def write(self, chunk: np.ndarray):
+        # Append (n, 2) points to the route
+        chunk = np.asarray(chunk).reshape(-1, 2)
+        if len(chunk) == 0:
+            return
+        self._n += len(chunk)
+        self._min = np.minimum(self._min, np.min(chunk, axis=0))
+        self._max = np.maximum(self._max, np.max(chunk, axis=0))
+        if self._binary:
+            self._file.write(np.ascontiguousarray(chunk, dtype=self._dtype).tobytes())
+        else:
+            np.savetxt(self._file, chunk, fmt=XY_FORMAT, delimiter=", ")
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._binary:
+            bounds = np.concatenate([self._min, self._max]) if self._n > 0 else np.zeros(4)
+            self._file.seek(0)
+            self._file.write(HEADER.pack(MAGIC, VERSION, self._dtype.itemsize, self._n, *bounds.tolist()))
+        self._file.close()
+
+    def __enter__(self) -> "RouteWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_route_chunks(fname: str, chunk_size: int = 65536) -> Iterator[np.ndarray]:
+    # Yield the (n, 2) points of a binary or text route file, chunk_size at a
+    # time, without ever holding the whole route in memory
+    if is_binary_route(fname):
+        route = read_binary(fname)
+        for i in range(0, len(route), chunk_size):
+            yield np.array(route[i:i + chunk_size], dtype=float)
+        return
+
+    with open(fname) as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if len(lines) == 0:
+                return
+
+            # Skip chunks of only blank (or comment) lines
+            lines = [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+            if len(lines) > 0:
+                yield np.loadtxt(lines, delimiter=",", dtype=float, ndmin=2).reshape(-1, 2)
+
+
+def route_extent(fname: str, chunk_size: int = 65536) -> Tuple[int, Tuple[Tuple[float, float], Tuple[float, float]]]:
+    # The number of points and bounds of a route file, read from the header
+    # of binary routes, or with a single chunked pass over text routes
+    if is_binary_route(fname):
+        header = read_header(fname)
+        return header["points"], header["bounds"]
+
+    n = 0
+    lo = np.full(2, np.inf)
+    hi = np.full(2, -np.inf)
+    for chunk in iter_route_chunks(fname, chunk_size):
+        if len(chunk) == 0:
+            continue
+        n += len(chunk)
+        lo = np.minimum(lo, np.min(chunk, axis=0))
+        hi = np.maximum(hi, np.max(chunk, axis=0))
+    return n, (tuple(lo.tolist()), tuple(hi.tolist()))
+
+
+def normalization(bounds, scale: float = 1.0, center: bool = False) -> Tuple[float, np.ndarray]:
+    # The (factor, shift) such that route * factor - shift normalizes a route with the
+    # given bounds, so that the maximum of width, height is given by the scale factor
+    lo, hi = np.asarray(bounds, dtype=float)
+    factor = scale / np.max(hi - lo)
+    shift = (hi + lo) * 0.5 * factor if center else np.zeros(2)
+    return factor, shift
+
+
+def normalize_route(route: np.ndarray, scale: float = 1.0, center: bool = False) -> np.ndarray:
+    # Normalize route so maximum of width, height
+    # is given by the scale factor (and optionally center it)
+    route = np.array(route, dtype=float)
+    factor, shift = normalization(route_bounds(route), scale=scale, center=center)
+    return route * factor - shift
+
+
+def iter_normalized(fname: str, scale: float = 1.0, center: bool = False,
+                    chunk_size: int = 65536, bounds=None) -> Iterator[np.ndarray]:
+    # Yield the points of a route file normalized as by normalize_route, a chunk at
+    # a time (the bounds are found first, if not given, see route_extent)
+    if bounds is None:
+        n, bounds = route_extent(fname, chunk_size)
+    factor, shift = normalization(bounds, scale=scale, center=center)
+    for chunk in iter_route_chunks(fname, chunk_size):
+        yield chunk * factor - shift
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import Tuple
+
+
+def segment_distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Distance from each of the (n, d) points to the segment from the
+    # corresponding (n, d) point in a to the one in b
+    ab = b - a
+    ap = points - a
+    ab2 = np.einsum("ij,ij->i", ab, ab)
+    t = np.einsum("ij,ij->i", ap, ab) / np.where(ab2 > 0, ab2, 1.0)
+    ap -= np.clip(t, 0.0, 1.0)[:, None] * ab
+    return np.sqrt(np.einsum("ij,ij->i", ap, ap))
+
+
+def simplify_indices(route: np.ndarray, tolerance: float) -> np.ndarray:
+    # Indices of the points of an (N, d) route kept by Ramer-Douglas-Peucker
+    # simplification, so no dropped point is further than tolerance from the
+    # simplified route. Rather than recursing, every open span between kept
+    # points is split at its furthest point at once, so each pass is a few
+    # array operations over the points still in open spans.
+    route = np.asarray(route, dtype=float)
+    n = len(route)
+    keep = np.zeros(n, dtype=bool)
+    if n > 0:
+        keep[[0, -1]] = True
+    active = ~keep  # Points in spans that may still need splitting
+
+    while True:
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+
+        # The kept points either side of each active point
+        kept = np.flatnonzero(keep)
+        right = np.searchsorted(kept, idx)
+        left, right = kept[right - 1], kept[right]
+        d = segment_distances(route[idx], route[left], route[right])
+
+        # The furthest point in each span (spans are contiguous, as idx is sorted)
+        starts = np.flatnonzero(np.concatenate([[True], left[1:] != left[:-1]]))
+        span = np.zeros(len(idx), dtype=np.int64)
+        span[starts[1:]] = 1
+        span = np.cumsum(span)
+        d_max = np.maximum.reduceat(d, starts)
+        furthest = np.flatnonzero(d == d_max[span])
+        furthest = furthest[np.concatenate([[True], span[furthest[1:]] != span[furthest[:-1]]])]
+
+        # Split the spans that stray too far, and we're done with the rest
+        split = d_max > tolerance
+        keep[idx[furthest[split[span[furthest]]]]] = True
+        active[idx] = split[span] & ~keep[idx]
+
+    return np.flatnonzero(keep)
+
+
+def simplify_route(route: np.ndarray, tolerance: float) -> Tuple[np.ndarray, dict]:
+    # Drop the points of an (N, d) route whose removal moves the route by at
+    # most tolerance (see simplify_indices). Returns the simplified route and
+    # a report of the points removed.
+    route = np.asarray(route)
+    simplified = route[simplify_indices(route, tolerance)]
+    return simplified, {
+        "points_before": len(route),
+        "points_after": len(simplified),
+        "reduction": 1.0 - len(simplified) / len(route) if len(route) > 0 else 0.0,
+    }
+
+
+def step_tolerance(spider, steps: float = 0.5) -> float:
+    # A simplification tolerance (in spider units) of the given number of motor
+    # steps. No wire length changes by more than the pen moves, so dropping points
+    # this close to the simplified route changes each step target by at most one.
+    return steps / spider.steps_per_dl
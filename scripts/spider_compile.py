@@ -0,0 +1,43 @@
+#!/usr/bin/python3.7
+# Compile an .xy route into a step stream, to be drawn with spider_play.py.
+# This does all of the planning, so can be run on a faster machine.
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.planner import plan_route
+from spider_printer.spider.step_stream import StepStream
+from spider_printer.paths.cache import cached_file
+from spider_printer.paths.route import read_route, normalize_route
+import numpy as np
+import sys
+
+if len(sys.argv) < 3:
+    print("Arguments: route.xy output.steps")
+    quit()
+
+scale = float(input("Scale factor: "))
+center = input("Would you like to center the path? y/n: ") == "y"
+
+# Optionally speed up along the route, blending through points without stopping
+min_step_time = input("Minimum step time in seconds (blank to draw at constant speed): ").strip()
+profile = {}
+if min_step_time != "":
+    profile = dict(motion_profile="trapezoid", min_step_time=float(min_step_time))
+
+
+def compile_route(fname):
+    # Plan for a freshly-started spider, with the route
+    # at the initial spider z position
+    s = Spider(gp=FakeGPIO(), auto_reset=False, **profile)
+    route = normalize_route(read_route(sys.argv[1]), scale=scale, center=center)
+    route = np.hstack([route, np.full((len(route), 1), s.initial_z)])
+    plan_route(s, route).save(fname)
+
+
+# Reuse the step stream if this route has been compiled with these settings before
+from_cache = cached_file(sys.argv[2], compile_route, "spider_compile",
+                         {"scale": scale, "center": center, **profile}, files=[sys.argv[1]],
+                         code=[Spider, plan_route, StepStream])
+stream = StepStream.load(sys.argv[2])
+print(f"{len(stream)} step runs, saved as {sys.argv[2]}" + (" (from the cache)" if from_cache else ""))
+if stream.duration > 0:
+    print(f"Estimated drawing time: {stream.duration:.1f}s")
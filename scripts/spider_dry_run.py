@@ -0,0 +1,24 @@
+#!/usr/bin/python3.7
+# Work out how long a route would take to draw, without drawing it
+from spider_printer.spider.dry_run import dry_run, format_report
+from spider_printer.paths.route import read_route, normalize_route
+from spider_printer.spider.spider import HEIGHT
+import numpy as np
+import sys
+
+route = normalize_route(
+    read_route(sys.argv[1]),
+    scale=float(input("Scale factor: ")),
+    center=input("Would you like to center the path? y/n: ") == "y"
+)
+
+settings = {}
+min_step_time = input("Minimum step time in seconds (blank to draw at constant speed): ").strip()
+if min_step_time != "":
+    settings = dict(motion_profile="trapezoid", min_step_time=float(min_step_time))
+plan = input("Would you like to plan the whole route ahead? y/n: ") == "y"
+
+# Route at the initial spider z position
+route = np.hstack([route, np.full((len(route), 1), -HEIGHT)])
+
+print(format_report(dry_run(route, plan=plan, **settings)))
@@ -1,49 +1,126 @@
 #!/usr/bin/python3.7
 from spider_printer import Spider
+from spider_printer.paths.route import route_extent, normalization, iter_normalized, read_route
+from spider_printer.paths.simplify import simplify_indices, step_tolerance
+from spider_printer.spider.checkpoint import save_checkpoint, load_checkpoint, remove_checkpoint
+import argparse
 import numpy as np
+import os
 import sys
 import time
 
-route = []
-with open(sys.argv[1]) as f:
-    for line in f:
-        route.append([float(x) for x in line.split(",")] + [0.0])
-route = np.array(route)
+parser = argparse.ArgumentParser(description="Draw a route")
+parser.add_argument("route", help="route file (.xy or .xyb)")
+parser.add_argument("--resume", action="store_true",
+                    help="continue an interrupted drawing from its checkpoint")
+parser.add_argument("--checkpoint", default=None,
+                    help="checkpoint file (default: the route file name + .checkpoint)")
+parser.add_argument("--checkpoint-interval", type=float, default=1.0,
+                    help="seconds between checkpoints (0 to checkpoint after every point)")
+parser.add_argument("--simplify", type=float, default=0.5,
+                    help="drop points that move the route by less than this many motor steps (0 to draw every point)")
+args = parser.parse_args()
+checkpoint_file = args.checkpoint or args.route + ".checkpoint"
 
-# Normalize route so maximum of width, height
-# is given by the scale factor
-a = 0.0
-for i in range(2):
-    a = max(a, max(route[:, i]) - min(route[:,i]))
-route /= a
-route *= float(input("Scale factor: "))
+# Find the size of the route, without loading it all
+# (binary routes have this in their header)
+n_points, bounds = route_extent(args.route)
 
-if input("Would you like to center the path? y/n: ") == "y":
-    # Center the path
-    for i in range(2):
-        route[:, i] -= (max(route[:,i]) + min(route[:, i]))*0.5
+checkpoint = None
+if args.resume:
+    checkpoint = load_checkpoint(checkpoint_file)
+    if checkpoint is None:
+        print(f"No checkpoint found at {checkpoint_file}")
+        quit()
+    if checkpoint["route"] != os.path.abspath(args.route) or checkpoint["points"] != n_points:
+        print(f"Checkpoint {checkpoint_file} is for a different route ({checkpoint['route']})")
+        quit()
+    scale, center = checkpoint["scale"], checkpoint["center"]
+    print(f"Resuming from point {checkpoint['index']}/{n_points} with motor steps {checkpoint['steps']}")
+else:
+    # Normalize route so maximum of width, height
+    # is given by the scale factor
+    scale = float(input("Scale factor: "))
+    center = input("Would you like to center the path? y/n: ") == "y"
 
 # Print range in each coordinate
+factor, shift = normalization(bounds, scale=scale, center=center)
+lo, hi = np.asarray(bounds) * factor - shift
 for i in range(2):
-    a, b = min(route[:, i]), max(route[:, i])
-    print(f"{['x', 'y'][i]} range = [{a}, {b}]")
+    print(f"{['x', 'y'][i]} range = [{lo[i]}, {hi[i]}]")
 
 if input("Would you like to see the path now? y/n: ") == "y":
     # Plot path
     import matplotlib.pyplot as plt
-    plt.plot(route.T[0], route.T[1])
-    plt.gca().set_aspect(1.0)
+    from spider_printer.paths.preview import plot_route
+    route = read_route(args.route) * factor - shift
+    plot_route(route)
     plt.show()
+    del route
 
-# Set the z coordinate of the route to the initial spider z position
 s = Spider()
-route[:, 2] = s.initial_z
+start_index = 0
+if checkpoint is not None:
+    # The pen was left where the drawing stopped
+    s.restore_steps(checkpoint["steps"])
+    start_index = checkpoint["index"]
+
+
+def checkpoint_state(index):
+    return {"route": os.path.abspath(args.route), "points": n_points, "scale": scale,
+            "center": center, "index": index, "steps": s.steps}
+
 
 if input(f"Would you like to send the route to the printer? y/n: ") == "y":
-    # Draw path
+    # Draw path, a chunk at a time, with the z coordinate
+    # of the route at the initial spider z position, dropping points
+    # closer to the route than --simplify steps. Points are still numbered
+    # as in the route file, so checkpoints don't depend on the simplification.
     start_time = time.time()
-    for i, r in enumerate(route):
-        s.position = r
-        x = (i+1)/len(route)
-        t = time.time() - start_time
-        print(f"{t:5.3f}s {x*100:5.3f}% complete, ETA = {t*(1-x)/x:10.5f}s")
+    last_checkpoint = 0.0
+    tolerance = step_tolerance(s, args.simplify)
+    n_drawn = 0
+    chunk_start = 0
+    done = start_index  # Points up to (and including) done are drawn
+    finished = False
+
+    # Leave the pen where it is if the drawing stops early (interrupted, or
+    # on any error), so the checkpoint says where it is, and we can carry on
+    s.auto_reset = False
+    try:
+        for chunk in iter_normalized(args.route, scale=scale, center=center, bounds=bounds):
+            chunk = np.hstack([chunk, np.full((len(chunk), 1), s.initial_z)])
+            keep = simplify_indices(chunk, tolerance) if args.simplify > 0 else np.arange(len(chunk))
+            for k in keep:
+                i = chunk_start + int(k) + 1
+                if i <= start_index:
+                    continue  # Already drawn
+
+                s.position = chunk[k]
+                done = i
+                n_drawn += 1
+
+                if time.time() - last_checkpoint >= args.checkpoint_interval:
+                    save_checkpoint(checkpoint_file, checkpoint_state(done))
+                    last_checkpoint = time.time()
+
+                x = (i - start_index)/(n_points - start_index)
+                t = time.time() - start_time
+                print(f"{t:5.3f}s {i/n_points*100:5.3f}% complete, ETA = {t*(1-x)/x:10.5f}s")
+
+            chunk_start += len(chunk)
+        finished = True
+
+    except KeyboardInterrupt:
+        print(f"\nInterrupted, resume with: {sys.argv[0]} {args.route} --resume")
+
+    finally:
+        if not finished:
+            save_checkpoint(checkpoint_file, checkpoint_state(done))
+
+    if not finished:
+        quit()
+
+    s.auto_reset = True
+    remove_checkpoint(checkpoint_file)
+    print(f"Drew {n_drawn} of {n_points - start_index} points, the rest were simplified away")
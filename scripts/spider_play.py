@@ -0,0 +1,11 @@
+#!/usr/bin/python3.7
+# Draw a step stream compiled by spider_compile.py
+from spider_printer import Spider
+from spider_printer.spider.step_stream import StepStream
+import sys
+
+stream = StepStream.load(sys.argv[1])
+s = Spider()
+
+if input(f"Would you like to send {len(stream)} step runs to the printer? y/n: ") == "y":
+    s.play(stream)
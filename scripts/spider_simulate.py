@@ -0,0 +1,39 @@
+#!/usr/bin/python3.7
+# Work out where the pen would really go drawing a route (one motor step at
+# a time), how far that strays from the route, and save pictures of both
+from spider_printer.spider.simulate import simulate, format_report
+from spider_printer.paths.preview import rasterize, write_png
+from spider_printer.paths.route import read_route, normalize_route
+from spider_printer.spider.spider import HEIGHT
+import numpy as np
+import sys
+
+if len(sys.argv) < 2:
+    print("Arguments: route.xy [output name]")
+    quit()
+
+route = read_route(sys.argv[1])
+if len(route) == 0:
+    print(f"{sys.argv[1]} has no points to draw")
+    quit()
+
+route = normalize_route(
+    route,
+    scale=float(input("Scale factor: ")),
+    center=input("Would you like to center the path? y/n: ") == "y"
+)
+
+# Route at the initial spider z position
+route = np.hstack([route, np.full((len(route), 1), -HEIGHT)])
+
+report = simulate(route)
+print(format_report(report))
+
+# Both pictures at the same scale, so they can be compared pixel for pixel
+name = sys.argv[2] if len(sys.argv) > 2 else "simulated"
+trajectory = report["trajectory"][:, :2]
+points = np.vstack([trajectory, route[:, :2]])
+bounds = np.min(points, axis=0), np.max(points, axis=0)
+write_png(name + ".png", rasterize(trajectory, bounds=bounds))
+write_png(name + "_route.png", rasterize(route[:, :2], bounds=bounds))
+print(f"Saved {name}.png (drawn) and {name}_route.png (intended)")
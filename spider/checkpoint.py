@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+
+
+def save_checkpoint(fname: str, state: dict):
+    # Atomically save the (JSON-serializable) state to fname. The state is
+    # written to a temporary file in the same directory, flushed to disk,
+    # then moved over fname, so fname is always either the previous or the
+    # new checkpoint, even if we're interrupted (or lose power) part way.
+    directory = os.path.dirname(os.path.abspath(fname))
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".checkpoint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, fname)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def load_checkpoint(fname: str) -> dict:
+    # Load a checkpoint saved with save_checkpoint (or None if there isn't one)
+    if not os.path.exists(fname):
+        return None
+    with open(fname) as f:
+        return json.load(f)
+
+
+def remove_checkpoint(fname: str):
+    if os.path.exists(fname):
+        os.unlink(fname)
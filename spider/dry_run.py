@@ -0,0 +1,73 @@
+from spider_printer.spider.spider import Spider, MM_PER_REV
+from spider_printer.spider.fake_gpio import RecordingGPIO
+from spider_printer.spider.planner import plan_route
+import numpy as np
+
+
+def dry_run(route: np.ndarray, plan: bool = False, call_time: float = 50e-6,
+            n_slowest: int = 10, **settings) -> dict:
+    # Draws the (N, 3) route with a Spider (made with the given settings) on
+    # a RecordingGPIO with a simulated clock, point by point as spider_path.py
+    # does (or as one planned stream), and reports how the job would go.
+    # call_time models the time taken by each GPIO call on the real machine.
+    route = np.asarray(route, dtype=float)
+    gp = RecordingGPIO(call_time=call_time)
+    s = Spider(gp=gp, auto_reset=False, **settings)
+    start_position = s.position
+    start_steps = np.array(s.steps)
+    targets = s.step_targets(route)
+
+    if plan:
+        s.play(plan_route(s, route))
+    else:
+        for r in route:
+            s.position = r
+
+    # Every pulse is a rising edge on at least one step pin, and
+    # (as pins are written together) edges of a pulse share a time
+    edges = np.concatenate([gp.rising_edges(step_pin) for step_pin, dir_pin in s.pins])
+    pulse_times = np.unique(gp.trace["time_ns"][edges]) / 1e9
+
+    # Each segment takes as many pulses as its fastest motor takes steps
+    deltas = np.diff(np.vstack([start_steps[None, :], targets]), axis=0)
+    pulses = np.max(np.abs(deltas), axis=1)
+    assert np.sum(pulses) == len(pulse_times), f"{np.sum(pulses)} pulses planned, {len(pulse_times)} made"
+
+    # A segment lasts from the last pulse of the previous segment to its own last pulse
+    end_times = np.concatenate([[0.0], pulse_times])[np.cumsum(pulses)]
+    durations = np.diff(np.concatenate([[0.0], end_times]))
+
+    # Pen travel
+    lengths = np.linalg.norm(np.diff(np.vstack([start_position[None, :], route]), axis=0), axis=1)
+
+    slowest = np.argsort(-durations, kind="stable")[:n_slowest]
+    return {
+        "points": len(route),
+        "moves": int(np.count_nonzero(pulses)),
+        "pulses": int(np.sum(pulses)),
+        "steps_per_motor": np.sum(np.abs(deltas), axis=0),
+        "travel_mm": float(np.sum(lengths) * MM_PER_REV),
+        "time_s": s.timing["achieved_s"],
+        "segment_times_s": durations,
+        "slowest_segments": [
+            {"index": int(i), "time_s": float(durations[i]),
+             "length_mm": float(lengths[i] * MM_PER_REV), "pulses": int(pulses[i])}
+            for i in slowest
+        ],
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Points          : {report['points']}",
+        f"Moves           : {report['moves']}",
+        f"Pulses          : {report['pulses']}",
+        f"Steps per motor : {', '.join(str(n) for n in report['steps_per_motor'])}",
+        f"Pen travel      : {report['travel_mm']:.1f} mm",
+        f"Estimated time  : {report['time_s']:.1f} s ({report['time_s'] / 3600:.2f} h)",
+        f"Slowest segments:",
+    ]
+    for seg in report["slowest_segments"]:
+        lines.append(f"   point {seg['index']:8d} : {seg['time_s']:8.3f} s "
+                     f"{seg['length_mm']:8.2f} mm {seg['pulses']:6d} pulses")
+    return "\n".join(lines)
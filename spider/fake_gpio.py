@@ -1,3 +1,7 @@
+import numpy as np
+import time
+
+
 class FakeGPIO:
     BCM = "BCM"
     OUT = "OUT"
@@ -14,4 +18,102 @@ class FakeGPIO:
         pass
 
     def output(self, pin, value):
-        pass
+        # Like RPi.GPIO, pin can be a list of pins with either
+        # a single value for all of them, or a value per pin
+        if isinstance(pin, (list, tuple)) and isinstance(value, (list, tuple)):
+            assert len(pin) == len(value), f"{len(pin)} pins, but {len(value)} values"
+
+
+class RecordingGPIO(FakeGPIO):
+
+    # The recorded trace: virtual time, pin and value (1 = HIGH) of every pin write
+    TRACE_DTYPE = np.dtype([("time_ns", "<i8"), ("pin", "u1"), ("value", "u1")])
+
+    def __init__(self, simulate_clock=True, call_time=0.0, capacity=4096):
+        super().__init__()
+
+        # With a simulated clock, sleeping just moves the clock on (so
+        # recording a long drawing is quick), and each output call takes
+        # call_time seconds (to model GPIO overhead). Otherwise the real
+        # clock is used, with real sleeps.
+        self._simulate_clock = simulate_clock
+        self._call_time_ns = round(call_time * 1e9)
+        self._now_ns = 0
+        self._t0_ns = time.perf_counter_ns()
+
+        # The trace is kept in arrays, doubled in size when full
+        self._trace = np.zeros(capacity, dtype=RecordingGPIO.TRACE_DTYPE)
+        self._n = 0
+
+    @property
+    def simulate_clock(self) -> bool:
+        return self._simulate_clock
+
+    def clock_ns(self) -> int:
+        if self._simulate_clock:
+            return self._now_ns
+        return time.perf_counter_ns() - self._t0_ns
+
+    def sleep(self, seconds: float):
+        if self._simulate_clock:
+            self._now_ns += max(round(seconds * 1e9), 0)
+        else:
+            time.sleep(seconds)
+
+    def output(self, pin, value):
+        super().output(pin, value)
+        pins = pin if isinstance(pin, (list, tuple)) else [pin]
+        values = value if isinstance(value, (list, tuple)) else [value] * len(pins)
+
+        # Grow the trace if needed
+        if self._n + len(pins) > len(self._trace):
+            trace = np.zeros(max(2 * len(self._trace), self._n + len(pins)), dtype=RecordingGPIO.TRACE_DTYPE)
+            trace[:self._n] = self._trace[:self._n]
+            self._trace = trace
+
+        new = self._trace[self._n:self._n + len(pins)]
+        new["time_ns"] = self.clock_ns()
+        new["pin"] = pins
+        new["value"] = [v == self.HIGH for v in values]
+        self._n += len(pins)
+
+        if self._simulate_clock:
+            self._now_ns += self._call_time_ns
+
+    @property
+    def trace(self) -> np.ndarray:
+        return self._trace[:self._n]
+
+    @property
+    def duration(self) -> float:
+        # Time (s) from the first to the last recorded pin write
+        if self._n == 0:
+            return 0.0
+        return float(self._trace["time_ns"][self._n - 1] - self._trace["time_ns"][0]) / 1e9
+
+    def rising_edges(self, pin: int) -> np.ndarray:
+        # Trace indices at which the pin went from LOW (as pins start) to HIGH
+        trace = self.trace
+        idx = np.flatnonzero(trace["pin"] == pin)
+        values = trace["value"][idx]
+        rising = values.astype(bool)
+        rising[1:] &= values[:-1] == 0
+        return idx[rising]
+
+    def step_times(self, pin: int) -> np.ndarray:
+        # Times (s) at which a motor with the given step pin stepped
+        return self.trace["time_ns"][self.rising_edges(pin)] / 1e9
+
+    def step_counts(self, pins) -> np.ndarray:
+        # Rebuild the number of steps made by each motor, given their (step pin, dir pin)
+        # pairs. Motors step forward if their dir pin was HIGH at the rising edge.
+        trace = self.trace
+        counts = np.zeros(len(pins), dtype=np.int64)
+        for i, (step_pin, dir_pin) in enumerate(pins):
+            edges = self.rising_edges(step_pin)
+            dir_idx = np.flatnonzero(trace["pin"] == dir_pin)
+            last_dir = np.searchsorted(dir_idx, edges) - 1
+            assert np.all(last_dir >= 0), f"Motor {i} stepped before its direction was set"
+            forward = trace["value"][dir_idx[last_dir]].astype(bool)
+            counts[i] = np.sum(forward) - np.sum(~forward)
+        return counts
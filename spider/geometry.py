@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class SpiderGeometry:
+
+    def __init__(self, inner_radius: float, outer_radius: float):
+
+        # Save input settings
+        self._inner_radius = inner_radius
+        self._outer_radius = outer_radius
+
+        # Work out the position of each motor/link point
+        motor_positions = np.zeros((3, 3))
+        for i, angle in enumerate([np.pi / 2 + np.pi / 3, np.pi / 2 - np.pi / 3, 3 * np.pi / 2]):
+            motor_positions[i] = (np.cos(angle), np.sin(angle), 0.0)
+        link_offsets = motor_positions.copy()
+        motor_positions *= outer_radius
+        link_offsets *= inner_radius
+
+        # The geometry is fixed once built, so it can be
+        # shared freely between spiders/planners
+        motor_positions.flags.writeable = False
+        link_offsets.flags.writeable = False
+        self._motor_positions = motor_positions
+        self._link_offsets = link_offsets
+
+        # Get reference positions (and their squared magnitudes)
+        self._ref_poss = motor_positions - link_offsets
+        self._ref_mags2 = np.sum(self._ref_poss ** 2, axis=1)
+        assert all(abs(p[2]) < 1e-4 for p in self._ref_poss), \
+            "Forward kinematics assumes reference positions in the Z = 0 plane!"
+
+        # Subtracting the sphere equations |p - r_i|^2 = l_i^2 pairwise gives
+        # linear equations for x, y in terms of the squared wire lengths:
+        #   (r_i - r_j) . p = (|r_i|^2 - |r_j|^2 + l_j^2 - l_i^2) / 2
+        # There are three ways to choose two such equations; solve each once
+        # here (so that x, y = A @ l^2 + c) and average, as they only differ
+        # for inconsistent wire lengths.
+        a = np.zeros((2, 3))
+        c = np.zeros(2)
+        for pairs in [
+            [[0, 1], [0, 2]],
+            [[1, 0], [1, 2]],
+            [[2, 0], [2, 1]]
+        ]:
+            m = np.zeros((2, 2))  # Matrix on LHS
+            d = np.zeros((2, 3))  # RHS dependence on l^2
+            e = np.zeros(2)  # Constant part of RHS
+            for n, (i, j) in enumerate(pairs):
+                m[n] = (self._ref_poss[i] - self._ref_poss[j])[:2]
+                d[n, i] -= 0.5
+                d[n, j] += 0.5
+                e[n] = (self._ref_mags2[i] - self._ref_mags2[j]) / 2
+            m_inv = np.linalg.inv(m)
+            a += m_inv @ d
+            c += m_inv @ e
+        self._xy_from_l2 = a / 3.0
+        self._xy_offset = c / 3.0
+
+    @property
+    def inner_radius(self) -> float:
+        return self._inner_radius
+
+    @property
+    def outer_radius(self) -> float:
+        return self._outer_radius
+
+    @property
+    def motor_positions(self) -> np.ndarray:
+        return self._motor_positions
+
+    @property
+    def link_offsets(self) -> np.ndarray:
+        return self._link_offsets
+
+    def wire_lengths_at(self, pos: np.ndarray) -> np.ndarray:
+        # Work out the wire lengths at the given position
+        return self.wire_lengths_at_many(np.asarray(pos, dtype=float)[None, :])[0]
+
+    def wire_lengths_at_many(self, positions: np.ndarray) -> np.ndarray:
+        # Work out the wire lengths at each of the (N, 3) given
+        # positions, returning an (N, 3) array (one column per motor)
+        positions = np.asarray(positions, dtype=float)
+        assert positions.ndim == 2 and positions.shape[1] == 3, \
+            f"Expected an (N, 3) array of positions, got shape {positions.shape}"
+
+        # Wire i runs from motor i to link point i = pos + link offset i
+        delta = self._motor_positions[None, :, :] - self._link_offsets[None, :, :] - positions[:, None, :]
+        return np.sqrt(np.einsum("nij,nij->ni", delta, delta))
+
+    def positions_from_wire_lengths(self, wire_lengths: np.ndarray) -> np.ndarray:
+        # Work out the (N, 3) pen positions for each of
+        # the (N, 3) given triples of wire lengths
+        wire_lengths = np.asarray(wire_lengths, dtype=float)
+        assert wire_lengths.ndim == 2 and wire_lengths.shape[1] == 3, \
+            f"Expected an (N, 3) array of wire lengths, got shape {wire_lengths.shape}"
+        l2 = wire_lengths ** 2
+
+        # Solve for x, y
+        pos = np.zeros((len(wire_lengths), 3))
+        pos[:, :2] = l2 @ self._xy_from_l2.T + self._xy_offset
+
+        # Solve for z (the pen hangs below the motors), averaging over wires
+        #   z^2 = l_i^2 - |r_i|^2 + 2 (x, y) . r_i - x^2 - y^2
+        z2 = 2 * pos @ self._ref_poss.T + l2 - self._ref_mags2 - np.sum(pos ** 2, axis=1)[:, None]
+        pos[:, 2] = -np.abs(np.mean(z2, axis=1)) ** 0.5
+
+        return pos
@@ -0,0 +1,40 @@
+from typing import Sequence
+
+
+class GPIOBackend:
+
+    def __init__(self, gp, pins: Sequence[Sequence[int]]):
+        # Wraps a GPIO module (RPi.GPIO, or FakeGPIO) to write several pins
+        # in a single call - RPi.GPIO.output accepts a list of channels with
+        # either one value for all of them or a list of values. This
+        # means one call per edge, rather than one per motor.
+        self._gp = gp
+        self._step_pins = [step_pin for step_pin, dir_pin in pins]
+        self._dir_pins = [dir_pin for step_pin, dir_pin in pins]
+
+        # The step pins to write for each step bitmask (bit i => motor i)
+        self._step_pins_by_mask = [
+            [pin for i, pin in enumerate(self._step_pins) if (mask >> i) & 1]
+            for mask in range(1 << len(self._step_pins))
+        ]
+
+    def setup(self):
+        self._gp.setmode(self._gp.BCM)
+        self._gp.setup(self._step_pins + self._dir_pins, self._gp.OUT)
+
+    def output_many(self, pins: Sequence[int], values):
+        # Write one value to all pins, or a value per pin
+        if len(pins) > 0:
+            self._gp.output(list(pins), values)
+
+    def write_steps(self, mask: int, high: bool):
+        # Set the step pins of the motors in the bitmask high/low
+        self.output_many(self._step_pins_by_mask[mask], self._gp.HIGH if high else self._gp.LOW)
+
+    def write_directions(self, directions: Sequence[int], mask: int = None):
+        # Set the dir pins from the sign of each direction
+        # (only of the motors in the bitmask, if given)
+        motors = range(len(self._dir_pins)) if mask is None else \
+            [i for i in range(len(self._dir_pins)) if (mask >> i) & 1]
+        self.output_many([self._dir_pins[i] for i in motors],
+                         [self._gp.HIGH if directions[i] >= 0 else self._gp.LOW for i in motors])
@@ -0,0 +1,73 @@
+import numpy as np
+
+PROFILES = ("constant", "trapezoid", "s-curve")
+
+
+def s_curve_ramp_length(v_from, v_max: float, accel: float):
+    # Distance (steps) to ramp from v_from (a speed or array of speeds, below
+    # v_max) to v_max, with speed
+    #   v = v_from + dv*S(x), S(x) = 3x^2 - 2x^3, x = distance/length
+    # peaking at acceleration accel. The acceleration is
+    #   dv/dt = v*dv/ds = dv^2*p(x)/length, p(x) = 6x(1 - x)(r + S(x))
+    # with r = v_from/dv, so length is dv^2/accel times the peak of p. That's
+    # between x = 0.5 (r large) and 0.684 (r = 0), where p is concave, so
+    # a few Newton steps on p'(x) = 0 from in between find it.
+    # (Plain floats for a single speed, which are much quicker than numpy scalars)
+    v_from = float(v_from) if np.ndim(v_from) == 0 else np.asarray(v_from, dtype=float)
+    dv = v_max - v_from
+    r = v_from / dv
+    x = 0.6 + 0 * r
+    for _ in range(8):
+        dp = r - 2 * r * x + x * x * (9 - x * (20 - 10 * x))
+        ddp = -2 * r + x * (18 - x * (60 - 40 * x))
+        x = x - dp / ddp
+    p = 6 * x * (1 - x) * (r + x * x * (3 - 2 * x))
+    return dv ** 2 * p / accel
+
+
+def ramp_speeds(v_from, distance: np.ndarray, v_max: float, accel: float, profile: str) -> np.ndarray:
+    # Speed (steps/s) reached after accelerating from v_from (broadcast
+    # against distance) over the given distances (in steps), without going
+    # faster than v_max
+    distance = np.asarray(distance, dtype=float)
+    v_from = np.asarray(v_from, dtype=float)
+
+    if profile == "trapezoid":
+        # Constant acceleration: v^2 = u^2 + 2as
+        return np.minimum(np.sqrt(v_from ** 2 + 2 * accel * distance), v_max)
+
+    if profile == "s-curve":
+        # Ease in and out of the ramp (smoothstep in distance), over a ramp
+        # long enough that the acceleration never goes over accel
+        v_from = np.minimum(v_from, v_max)
+        ramping = v_from < v_max
+        ramp_length = s_curve_ramp_length(np.where(ramping, v_from, 0.0), v_max, accel)
+        x = np.clip(distance / ramp_length, 0.0, 1.0)
+        return np.where(ramping, v_from + (v_max - v_from) * x * x * (3 - 2 * x), v_max)
+
+    raise ValueError(f"Unknown motion profile '{profile}', expected one of {PROFILES}")
+
+
+def step_periods(n_steps: int, step_time: float, min_step_time: float = None,
+                 accel: float = 1000.0, profile: str = "trapezoid",
+                 entry_step_time: float = None, exit_step_time: float = None) -> np.ndarray:
+    # Returns the time (s) to spend on each of the n_steps pulses of a move.
+    # step_time is the (safe from standstill) period at the ends of the move,
+    # which speeds up to min_step_time with acceleration accel (steps/s^2).
+    # Moves too short to reach full speed peak part-way. The entry/exit
+    # periods can be set to join on to neighbouring moves without stopping.
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile '{profile}', expected one of {PROFILES}")
+
+    if profile == "constant" or min_step_time is None or min_step_time >= step_time:
+        return np.full(n_steps, float(step_time))
+
+    v_max = 1.0 / min_step_time
+    v_in = 1.0 / (step_time if entry_step_time is None else entry_step_time)
+    v_out = 1.0 / (step_time if exit_step_time is None else exit_step_time)
+
+    # Accelerate from the start, decelerate into the end
+    k = np.arange(n_steps)
+    v = np.minimum(ramp_speeds(min(v_in, v_max), k, v_max, accel, profile),
+                   ramp_speeds(min(v_out, v_max), n_steps - 1 - k, v_max, accel, profile))
+    return 1.0 / v
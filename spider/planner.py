@@ -0,0 +1,109 @@
+from spider_printer.spider.motion_profile import ramp_speeds, step_periods
+from spider_printer.spider.step_stream import StepStream
+import numpy as np
+from typing import Tuple
+
+
+def junction_speeds(deltas: np.ndarray, v_start: float, v_max: float,
+                    accel: float, junction_deviation: float) -> np.ndarray:
+    # Maximum speed (steps/s) through the junction between each consecutive
+    # pair of the (M, 3) moves (so M - 1 junctions), given as wire length
+    # (or step) changes - only their directions matter. This uses
+    # the "junction deviation" model: the speed at which the corner could
+    # be taken by a circular arc that strays at most junction_deviation
+    # steps from the corner, at the given acceleration. Straight on is
+    # limited only by v_max, and turning back on ourselves by v_start.
+    deltas = np.asarray(deltas, dtype=float)
+    if len(deltas) < 2:
+        return np.zeros(0)
+
+    units = deltas / np.linalg.norm(deltas, axis=1)[:, None]
+    cos_theta = np.clip(-np.sum(units[:-1] * units[1:], axis=1), -1.0, 1.0)
+    sin_half_theta = np.sqrt(0.5 * (1.0 - cos_theta))
+
+    with np.errstate(divide="ignore"):
+        v2 = accel * junction_deviation * sin_half_theta / (1.0 - sin_half_theta)
+    return np.clip(np.sqrt(v2), v_start, v_max)
+
+
+def plan_speeds(move_steps: np.ndarray, junction_limits: np.ndarray, v_start: float,
+                accel: float, lookahead: int, v_max: float = np.inf,
+                profile: str = "trapezoid") -> Tuple[np.ndarray, np.ndarray]:
+    # Works out the speed (steps/s) of the first and last pulses of each move,
+    # so that no junction is taken faster than its limit and the speed never
+    # changes faster than the motion profile's ramps (see ramp_speeds) allow.
+    # The route starts and ends at v_start, and so does the end of the
+    # look-ahead window (we must always be able to stop within the moves
+    # we've planned).
+    #
+    # The speeds are planned for a chain of pulses: the first and last pulses
+    # of each move, with n - 1 steps between them within a move of n steps,
+    # and one step across each junction (both capped by the junction limit).
+    # Ramps restart at each of them, as step_periods ramps each move
+    # separately (which, for s-curves, is slower than one long ramp).
+    n_moves = len(move_steps)
+    n = 2 * n_moves
+    caps = np.full(n, float(v_start))
+    caps[1:-1] = np.repeat(junction_limits, 2)
+    distance = np.ones(n - 1)
+    distance[::2] = np.asarray(move_steps, dtype=float) - 1
+
+    # Backward pass: slow down in time for every junction in the window,
+    # stepping back through each window (from stopped at its end) a pulse
+    # at a time, for all the windows at once
+    k = np.arange(n)
+    v = np.full(n, float(v_start))
+    for offset in range(2 * lookahead - 1, -1, -1):
+        j = k + offset
+        inside = j < n - 1
+        v[inside] = np.minimum(caps[j[inside]], ramp_speeds(v[inside], distance[j[inside]], v_max, accel, profile))
+
+    # Forward pass: only speed up as fast as we're able to (slowing
+    # down, or holding speed, is always possible)
+    for i in range(n - 1):
+        if v[i + 1] > v[i]:
+            v[i + 1] = min(v[i + 1], ramp_speeds(v[i], distance[i], v_max, accel, profile))
+
+    return v[::2], v[1::2]
+
+
+def plan_route(spider, positions: np.ndarray, lookahead: int = 16,
+               junction_deviation: float = 5.0) -> StepStream:
+    # Plans the (N, 3) route as one continuous step stream for the given
+    # spider (starting from its current steps), blending through route
+    # points without stopping, using the spider's motion profile settings
+    targets = spider.step_targets(positions)
+    start_steps = np.array(spider.steps)
+    deltas = np.diff(np.vstack([start_steps[None, :], targets]), axis=0)
+    moving = np.any(deltas != 0, axis=1)
+    deltas = deltas[moving]
+
+    if spider.motion_profile == "constant" or spider.min_step_time is None or len(deltas) == 0:
+        # No speeding up, so nothing to plan
+        return StepStream.from_step_targets(targets, start_steps=start_steps, steps_per_dl=spider.steps_per_dl)
+
+    # Speeds are in pulses (steps of the fastest motor) per second
+    v_start = 1.0 / spider.step_time
+    v_max = max(1.0 / spider.min_step_time, v_start)
+    move_steps = np.max(np.abs(deltas), axis=1)
+
+    # Take the angles between moves from the unrounded wire lengths, as
+    # the rounded steps of short moves point in very jagged directions
+    lengths = np.vstack([spider.wire_lengths[None, :], spider.wire_lengths_at_many(positions)[moving]])
+    limits = junction_speeds(np.diff(lengths, axis=0), v_start, v_max, spider.acceleration, junction_deviation)
+    entry, exit = plan_speeds(move_steps, limits, v_start, spider.acceleration, lookahead,
+                              v_max=v_max, profile=spider.motion_profile)
+
+    # Make each move accelerate/decelerate between its planned first and last pulse speeds
+    periods = np.concatenate([
+        step_periods(n, spider.step_time,
+                     min_step_time=spider.min_step_time,
+                     accel=spider.acceleration,
+                     profile=spider.motion_profile,
+                     entry_step_time=1.0 / v_in,
+                     exit_step_time=1.0 / v_out)
+        for n, v_in, v_out in zip(move_steps, entry, exit)
+    ])
+
+    return StepStream.from_step_targets(targets, start_steps=start_steps,
+                                        steps_per_dl=spider.steps_per_dl, periods=periods)
@@ -0,0 +1,95 @@
+import time
+from typing import Callable, Optional
+
+
+class StepScheduler:
+
+    def __init__(self,
+                 clock_ns: Callable[[], int] = time.perf_counter_ns,
+                 sleep: Optional[Callable[[float], None]] = time.sleep,
+                 spin_ns: int = 200_000,
+                 resync_after: float = 0.5):
+
+        # Edges are timed against absolute deadlines on a monotonic clock, so
+        # the time spent driving the pins (and planning between edges) comes
+        # out of the wait rather than adding to the step period. If sleep is
+        # None the schedule is only tracked (e.g. when using FakeGPIO).
+        self._clock_ns = clock_ns
+        self._sleep = sleep
+
+        # time.sleep can overshoot, so sleep until spin_ns before the
+        # deadline, then spin on the clock for the rest of the wait
+        self._spin_ns = spin_ns
+
+        # If an edge fires more than resync_after step periods late, give up
+        # on catching up (which would fire the next edges too close together
+        # for the motors to follow) and restart the schedule from now. Edges
+        # are then never less than (1 - resync_after) periods apart.
+        self._resync_after = resync_after
+
+        self._deadline = None
+        self._last_edge = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.edges = 0  # Number of edges scheduled
+        self.late_edges = 0  # Number of edges that fired after their deadline
+        self.resyncs = 0  # Number of times the schedule was restarted
+        self.total_lag_ns = 0  # Sum over edges of time fired after the deadline
+        self.max_lag_ns = 0  # Worst time fired after a deadline
+        self.target_ns = 0  # Total time requested between edges
+        self.achieved_ns = 0  # Total time actually taken between edges
+
+    def start(self):
+        # Start a new schedule from now (e.g. at the start of a move,
+        # so that the time spent planning isn't caught up on)
+        self._deadline = self._clock_ns()
+        self._last_edge = self._deadline
+
+    def wait(self, period: float):
+        # Wait until period seconds after the previous deadline
+        if self._deadline is None:
+            self.start()
+
+        period_ns = round(period * 1e9)
+        self._deadline += period_ns
+        self.target_ns += period_ns
+        self.edges += 1
+
+        if self._sleep is None:
+            # Not really waiting - pretend we hit the deadline exactly
+            self.achieved_ns += self._deadline - self._last_edge
+            self._last_edge = self._deadline
+            return
+
+        # Wait for the deadline
+        remaining = self._deadline - self._clock_ns()
+        if remaining > self._spin_ns:
+            self._sleep((remaining - self._spin_ns) / 1e9)
+        now = self._clock_ns()
+        while now < self._deadline:
+            now = self._clock_ns()
+
+        # Record how well we did
+        lag = now - self._deadline
+        if lag > 0:
+            self.late_edges += 1
+            self.total_lag_ns += lag
+            self.max_lag_ns = max(self.max_lag_ns, lag)
+        if lag > self._resync_after * period_ns:
+            self.resyncs += 1
+            self._deadline = now
+        self.achieved_ns += now - self._last_edge
+        self._last_edge = now
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "edges": self.edges,
+            "late_edges": self.late_edges,
+            "resyncs": self.resyncs,
+            "mean_lag_s": self.total_lag_ns / max(self.edges, 1) / 1e9,
+            "max_lag_s": self.max_lag_ns / 1e9,
+            "target_s": self.target_ns / 1e9,
+            "achieved_s": self.achieved_ns / 1e9,
+        }
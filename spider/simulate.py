@@ -0,0 +1,67 @@
+from spider_printer.spider.spider import Spider, MM_PER_REV
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.step_stream import compile_route
+from spider_printer.paths.simplify import segment_distances
+import numpy as np
+
+
+def simulate(route: np.ndarray, spider: Spider = None, **settings) -> dict:
+    # Works out where the pen really goes drawing the (N, 3) route with the
+    # spider (by default a fresh one, made with the given settings), point by
+    # point as spider_path.py does. Moves are made of whole motor steps, in
+    # the same step patterns the spider uses, so the pen only approximately
+    # follows the straight line between route points. This finds the pen
+    # position after every step (with forward kinematics), and how far
+    # it strays from the route.
+    route = np.asarray(route, dtype=float)
+    s = spider or Spider(gp=FakeGPIO(), auto_reset=False, **settings)
+    start_position = s.position
+    stream = compile_route(s, route)
+
+    # The motor steps after every pulse, and so the pen position
+    counts = stream.records["count"].astype(np.int64)
+    pulse_deltas = np.repeat(stream.step_deltas() // np.maximum(counts, 1)[:, None], counts, axis=0)
+    steps = np.vstack([stream.start_steps[None, :], stream.start_steps + np.cumsum(pulse_deltas, axis=0)])
+    trajectory = s.positions_from_steps(steps)
+
+    # The route segment each pulse belongs to (each move takes as
+    # many pulses as its fastest motor takes steps)
+    targets = s.step_targets(route)
+    pulses = np.max(np.abs(np.diff(np.vstack([stream.start_steps[None, :], targets]), axis=0)), axis=1)
+    segment = np.repeat(np.arange(len(route)), pulses)
+    starts = np.vstack([start_position[None, :], route[:-1]])
+
+    # How far the pen is from the line it should be drawing, in the plane
+    # of the paper (and, separately, above or below it)
+    deviation = segment_distances(trajectory[1:, :2], starts[segment, :2], route[segment, :2]) * MM_PER_REV
+    z_deviation = np.abs(trajectory[1:, 2] - route[segment, 2]) * MM_PER_REV
+    segment_max = np.zeros(len(route))
+    np.maximum.at(segment_max, segment, deviation)
+
+    # Where each move actually ends up, compared to the route point
+    ends = trajectory[np.cumsum(pulses)]
+    end_errors = np.linalg.norm(ends[:, :2] - route[:, :2], axis=1) * MM_PER_REV
+
+    return {
+        "points": len(route),
+        "pulses": int(np.sum(pulses)),
+        "trajectory": trajectory,
+        "deviation_mm": deviation,
+        "max_deviation_mm": float(np.max(deviation, initial=0.0)),
+        "rms_deviation_mm": float(np.sqrt(np.mean(deviation ** 2))) if len(deviation) > 0 else 0.0,
+        "max_z_deviation_mm": float(np.max(z_deviation, initial=0.0)),
+        "max_end_error_mm": float(np.max(end_errors, initial=0.0)),
+        "segment_max_deviation_mm": segment_max,
+        "worst_segment": int(np.argmax(segment_max)) if len(route) > 0 else None,
+    }
+
+
+def format_report(report: dict) -> str:
+    return "\n".join([
+        f"Points           : {report['points']}",
+        f"Pulses           : {report['pulses']}",
+        f"Max deviation    : {report['max_deviation_mm']:.3f} mm (at point {report['worst_segment']})",
+        f"RMS deviation    : {report['rms_deviation_mm']:.3f} mm",
+        f"Max end error    : {report['max_end_error_mm']:.3f} mm",
+        f"Max z deviation  : {report['max_z_deviation_mm']:.3f} mm",
+    ])
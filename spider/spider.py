@@ -1,4 +1,10 @@
-from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.fake_gpio import FakeGPIO, RecordingGPIO
+from spider_printer.spider.geometry import SpiderGeometry
+from spider_printer.spider.gpio_backend import GPIOBackend
+from spider_printer.spider.motion_profile import PROFILES, step_periods
+from spider_printer.spider.scheduler import StepScheduler
+from spider_printer.spider.step_pattern import make_step_pattern
+from spider_printer.spider.step_stream import StepStream
 
 try:
     import RPi.GPIO as gpio
@@ -6,7 +12,10 @@ except ImportError:
     gpio = FakeGPIO()
 
 import numpy as np
+import queue
+import threading
 import time
+import weakref
 from typing import Tuple, List
 
 EQ_TRI_EDGE_PER_RAD = 0.5 / np.cos(30 * np.pi / 180)
@@ -15,6 +24,9 @@ ALU_TRI_RADIUS = 919 * EQ_TRI_EDGE_PER_RAD / MM_PER_REV
 LID_RADIUS = 51 / MM_PER_REV
 HEIGHT = 405 / MM_PER_REV
 
+# Weights to turn a row of a step pattern into a bitmask (bit i => motor i steps)
+STEP_BITS = np.array([1, 2, 4])
+
 print("Dimensions:")
 print(f"   Triangle edge : {MM_PER_REV*ALU_TRI_RADIUS/EQ_TRI_EDGE_PER_RAD:10.5f} mm")
 print(f"   Lid radius    : {LID_RADIUS*MM_PER_REV:10.5f} mm")
@@ -45,6 +57,27 @@ def sphere_intersection_distance(c1: np.ndarray, r1: float, c2: np.ndarray, r2:
     return (r1 ** 2 - r2 ** 2 + c ** 2) / (2 * c)
 
 
+def _stepping_thread(spider_ref, moves: queue.Queue):
+    # Makes the moves queued by Spider.enqueue. Only holds a weak reference
+    # to the spider while waiting, so that it can still be garbage collected
+    # (and auto-reset) once the queue is empty.
+    while True:
+        move = moves.get()
+        spider = spider_ref()
+        try:
+            if move is None:
+                return  # Spider has been deleted
+            if spider is None or spider._stepping_error is not None:
+                continue  # Drop the rest of the queue
+            try:
+                spider._make_move(*move)
+            except Exception as e:
+                spider._stepping_error = e
+        finally:
+            moves.task_done()
+        spider = None
+
+
 class Spider:
 
     def __init__(self, pins=((2, 3), (17, 27), (10, 11)),
@@ -53,7 +86,11 @@ class Spider:
                  auto_reset=True,
                  step_time=0.01,
                  gp=gpio,
-                 initial_position=(0, 0, -HEIGHT)):
+                 initial_position=(0, 0, -HEIGHT),
+                 motion_profile="constant",
+                 min_step_time=None,
+                 acceleration=1000.0,
+                 queue_size=64):
 
         # Save input settings
         self._pins = pins
@@ -72,26 +109,79 @@ class Spider:
         #  get confused about their direction)
         self._step_time = step_time
 
+        # Moves start and end at step_time, but can speed up to
+        # min_step_time in between, accelerating at the given
+        # rate (steps/s^2) according to the motion profile
+        if motion_profile not in PROFILES:
+            raise ValueError(f"Unknown motion profile '{motion_profile}', expected one of {PROFILES}")
+        self._motion_profile = motion_profile
+        self._min_step_time = min_step_time
+        self._acceleration = acceleration
+
+        # Times the step pulse edges against absolute deadlines
+        # (FakeGPIO doesn't need to wait for any motors, but
+        #  RecordingGPIO can keep time on its own clock)
+        if isinstance(gp, RecordingGPIO):
+            self._scheduler = StepScheduler(clock_ns=gp.clock_ns, sleep=gp.sleep,
+                                            spin_ns=0 if gp.simulate_clock else 200_000)
+        else:
+            self._scheduler = StepScheduler(sleep=None if isinstance(gp, FakeGPIO) else time.sleep)
+
         # Setup motor pins
-        self._gp.setmode(self._gp.BCM)
-        for step_pin, dir_pin in self._pins:
-            self._gp.setup(step_pin, self._gp.OUT)
-            self._gp.setup(dir_pin, self._gp.OUT)
+        self._io = GPIOBackend(gp, pins)
+        self._io.setup()
 
         # Work out the position of each motor/link point
-        self._motor_positions = np.zeros((3, 3))
-        for i, angle in enumerate([np.pi / 2 + np.pi / 3, np.pi / 2 - np.pi / 3, 3 * np.pi / 2]):
-            self._motor_positions[i] = (np.cos(angle), np.sin(angle), 0.0)
-        self._link_offsets = self._motor_positions.copy()
-        self._motor_positions *= outer_radius
-        self._link_offsets *= inner_radius
+        self._geometry = SpiderGeometry(inner_radius, outer_radius)
+        self._motor_positions = self._geometry.motor_positions
+        self._link_offsets = self._geometry.link_offsets
+
+        # Wire lengths at the initial position (where the step count is zero)
+        self._init_wire_lengths = self._geometry.wire_lengths_at(self._init_position)
 
         # Number of steps each motor has taken
         self._steps = [0, 0, 0]
 
+        # Moves planned with enqueue wait in a bounded queue, to be made by a
+        # background stepping thread (so that we can plan the next moves while
+        # the motors are busy). Planned steps are where the queue will leave us.
+        self._planned_steps = [0, 0, 0]
+        self._moves = queue.Queue(maxsize=queue_size)
+        self._stepping_thread = None
+        self._stepping_error = None
+
     def __del__(self):
-        if self._auto_reset:
-            self.position = self._init_position
+        if not hasattr(self, "_stepping_thread"):
+            return  # Didn't finish initialising
+        try:
+            if self._stepping_thread is threading.current_thread():
+                # The stepping thread dropped the last reference to us, so
+                # can't be left to make the rest of the queue (or waited for)
+                self._drain_moves()
+            if self._auto_reset:
+                self.position = self._init_position
+        finally:
+            if self._stepping_thread is not None:
+                self._moves.put(None)  # Stop the stepping thread
+
+    @property
+    def auto_reset(self) -> bool:
+        return self._auto_reset
+
+    @auto_reset.setter
+    def auto_reset(self, value: bool):
+        # e.g. turn off to leave the pen where it is, when
+        # a drawing is interrupted and might be resumed
+        self._auto_reset = value
+
+    def restore_steps(self, steps):
+        # Tell the spider that the motors have already made the given
+        # number of steps from the initial position (e.g. when resuming
+        # an interrupted drawing, with the pen left where it stopped)
+        self.wait()
+        assert len(steps) == 3, f"Expected a step count per motor, got {steps}"
+        self._steps = [int(x) for x in steps]
+        self._planned_steps = list(self._steps)
 
     @property
     def initial_z(self) -> float:
@@ -109,149 +199,211 @@ class Spider:
     def wire_lengths(self) -> np.ndarray:
         # Initial wire lengths +
         # Additional length due to steps
-        return self.wire_lengths_at(self._init_position) + \
+        return self._init_wire_lengths + \
                np.array(self._steps) / self._steps_per_dl
 
     @property
     def position(self) -> np.ndarray:
+        return self._geometry.positions_from_wire_lengths(self.wire_lengths[None, :])[0]
 
-        # Will contain return value
-        pos = np.zeros(3)
-
-        # Get reference positions (and their magnitudes)
-        ref_poss = self._motor_positions - self._link_offsets
-        ref_mags = np.linalg.norm(ref_poss, axis=1)
-        assert all(abs(p[2]) < 1e-4 for p in ref_poss), \
-            "This method assumes reference positions in the Z = 0 plane!"
-
-        # Get lengths (distances of point to reference positions)
-        ls = self.wire_lengths
-
-        # Solve for x, y position (in each of the three possible ways)
-        for pairs in [
-            [[0, 1], [0, 2]],
-            [[1, 0], [1, 2]],
-            [[2, 0], [2, 1]]
-        ]:
-            m = np.zeros((2, 2))  # Matrix on LHS
-            b = np.zeros(2)  # Vector on RHS
-            for n, (i, j) in enumerate(pairs):
-                m[n] = (ref_poss[i] - ref_poss[j])[:2]
-                b[n] = (ref_mags[i] ** 2 - ref_mags[j] ** 2 + ls[j] ** 2 - ls[i] ** 2) / 2
-            pos[:2] += np.linalg.solve(m, b)
-
-        # Average the result
-        pos[:2] /= 3.0
-
-        # Solve for z
-        zs = []
-        for i in range(3):
-            zs.append(2 * np.dot(pos, ref_poss[i]) + ls[i] ** 2 - ref_mags[i] ** 2 - np.linalg.norm(pos) ** 2)
+    @position.setter
+    def position(self, pos: np.ndarray):
 
-        pos[2] = -abs(np.mean(zs)) ** 0.5
+        # Finish any queued moves first
+        self.wait()
 
-        return pos
+        move = self._plan_move(pos, self._steps)
+        if move is None:
+            return  # No full step to make
 
-    @position.setter
-    def position(self, pos: np.ndarray):
+        self._make_move(*move)
+        self._planned_steps = list(self._steps)
+
+        assert np.linalg.norm(self.position - pos) < 0.1
+
+    def enqueue(self, pos: np.ndarray):
+        # Plan a move to pos (following on from any moves already
+        # queued) to be made by the background stepping thread.
+        # Blocks while the queue is full.
+        move = self._plan_move(pos, self._planned_steps)
+        if move is None:
+            return  # No full step to make
+
+        if self._stepping_thread is None:
+            self._stepping_thread = threading.Thread(
+                target=_stepping_thread, args=(weakref.ref(self), self._moves), daemon=True)
+            self._stepping_thread.start()
+
+        self._planned_steps = [self._planned_steps[i] + move[0][i] for i in range(3)]
+        self._moves.put(move)
+
+    def _drain_moves(self):
+        # Make the queued moves on this thread (dropping them after an error)
+        while True:
+            try:
+                move = self._moves.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if move is not None and self._stepping_error is None:
+                    self._make_move(*move)
+            except Exception as e:
+                self._stepping_error = e
+            finally:
+                self._moves.task_done()
+
+    def wait(self):
+        # Wait for all queued moves to be made
+        self._moves.join()
+
+        if self._stepping_error is not None:
+            # The stepping thread gave up on the queue, so we're
+            # only where the motors actually got to
+            error, self._stepping_error = self._stepping_error, None
+            self._planned_steps = list(self._steps)
+            raise error
+
+    def _plan_move(self, pos: np.ndarray, from_steps) -> tuple:
+        # Work out the (steps, step pattern, step periods) needed to move from
+        # the given motor steps to pos, or None if no full step is needed
 
         # Work out how many steps each motor needs to take to adjust the position
-        delta_lengths = self.wire_lengths_at(pos) - self.wire_lengths
-        steps = [round(x * self._steps_per_dl) for x in delta_lengths]
+        steps = [int(x) for x in self.step_targets(np.asarray(pos, dtype=float)[None, :])[0] - from_steps]
         abs_steps = [abs(s) for s in steps]
         max_steps = max(abs_steps)
         if max_steps == 0:
-            return  # No full step to make
+            return None  # No full step to make
 
         # Work out a pattern for making the required steps
-        step_freq = np.array(abs_steps) / max_steps
-        cum_steps = np.zeros(3)
-        step_pattern = [[False, False, False]]
-        while True:
-
-            tot_steps = np.sum(step_pattern, axis=0)
-            if np.allclose(tot_steps, abs_steps):
-                break  # Generated the correct number of steps
-
-            # Work out which motors should make a step
-            cum_steps += step_freq
-            make_steps = cum_steps >= 1.0
-            for i in range(3):
-                if tot_steps[i] >= abs_steps[i]:
-                    make_steps[i] = False
-
-            step_pattern.append(make_steps)
-            cum_steps -= step_pattern[-1]
+        step_pattern = make_step_pattern(abs_steps)
 
         # Check the generated step pattern results in the correct number of steps
         total_steps = np.sum(step_pattern, axis=0)
         assert np.allclose(total_steps, abs_steps), f"{total_steps} != {abs_steps}"
+
+        return steps, step_pattern, self._step_periods(len(step_pattern))
+
+    def _make_move(self, steps, step_pattern, periods):
         expected_steps_after = [self._steps[i] + steps[i] for i in range(3)]
 
         # Set the step directions
-        for i, (step_pin, dir_pin) in enumerate(self._pins):
-            self._gp.output(dir_pin, self._gp.HIGH if steps[i] >= 0 else self._gp.LOW)
+        self._io.write_directions(steps)
 
         # Make the steps
-        for p in step_pattern:
-
-            if all([not x for x in p]):
-                continue  # No steps in this part of the pattern
-
-            # Reset to low (do this first, to give the dir pin
-            # change maximum time to be regestered before the high pulse)
-            for i, (step_pin, dir_pin) in enumerate(self._pins):
-                if p[i]:
-                    self._gp.output(step_pin, self._gp.LOW)
-            self.sleep(self._step_time / 2)
-
-            # High edge of step pulse
-            for i, (step_pin, dir_pin) in enumerate(self._pins):
-                if p[i]:
-                    self._gp.output(step_pin, self._gp.HIGH)
-                    self._steps[i] += 1 if steps[i] > 0 else -1  # Record step made
-            self.sleep(self._step_time / 2)
+        self._scheduler.start()
+        for mask, period in zip((step_pattern @ STEP_BITS).tolist(), periods):
+            self._pulse(mask, steps, period)
 
         # Check the expected number of steps were made by each motor
         for i in range(3):
             assert expected_steps_after[i] == self._steps[i]
 
-        assert np.linalg.norm(self.position - pos) < 0.1
+    def play(self, stream: StepStream):
+        # Replay a precompiled step stream (see step_stream.compile_route)
+        self.wait()
+        assert stream.steps_per_dl == self._steps_per_dl, \
+            f"Stream compiled for {stream.steps_per_dl} steps/rev, spider has {self._steps_per_dl}"
+        assert list(stream.start_steps) == self._steps, \
+            f"Stream starts at steps {list(stream.start_steps)}, but spider is at {self._steps}"
+
+        directions = None
+        self._scheduler.start()
+        for run_directions, mask, count, period in stream.runs():
+
+            # Only touch the dir pins when they change
+            if run_directions != directions:
+                directions = run_directions
+                self._io.write_directions(directions)
+
+            period = self._step_time if period is None else period
+            for n in range(count):
+                self._pulse(mask, directions, period)
+
+        assert list(stream.end_steps) == self._steps
+        self._planned_steps = list(self._steps)
+
+    def _step_periods(self, n_steps: int) -> np.ndarray:
+        # The time to spend on each step of an n_steps move
+        return step_periods(n_steps, self._step_time,
+                            min_step_time=self._min_step_time,
+                            accel=self._acceleration,
+                            profile=self._motion_profile)
+
+    def _pulse(self, mask: int, directions, period: float):
+        # Make a single step pulse (lasting period seconds) on each motor i
+        # with bit i of mask set, in the direction given by the sign of directions[i]
+
+        if mask == 0:
+            return  # No steps in this part of the pattern
+
+        # Reset to low (do this first, to give the dir pin
+        # change maximum time to be regestered before the high pulse)
+        self._io.write_steps(mask, high=False)
+        self._scheduler.wait(period / 2)
+
+        # High edge of step pulse
+        self._io.write_steps(mask, high=True)
+        for i in range(3):
+            if (mask >> i) & 1:
+                self._steps[i] += 1 if directions[i] > 0 else -1  # Record step made
+        self._scheduler.wait(period / 2)
 
     def tension(self, amt: float, motors=(0, 1, 2)):
 
+        # Finish any queued moves first
+        self.wait()
+
         # Work out how many steps this tensioning corresponds to
         steps = round(-amt * self._steps_per_dl)
 
         # Set the step directions
-        for i in motors:
-            self._gp.output(self._pins[i][1], self._gp.HIGH if steps >= 0 else self._gp.LOW)
+        mask = sum(1 << i for i in set(motors))
+        self._io.write_directions([steps] * 3, mask=mask)
 
-        for n in range(abs(steps)):
+        self._scheduler.start()
+        for period in self._step_periods(abs(steps)):
 
             # Set step pins to low
-            for i in motors:
-                self._gp.output(self._pins[i][0], self._gp.LOW)
-            self.sleep(self._step_time / 2)
+            self._io.write_steps(mask, high=False)
+            self._scheduler.wait(period / 2)
 
             # High edge of step pulse
-            for i in motors:
-                self._gp.output(self._pins[i][0], self._gp.HIGH)
-            self.sleep(self._step_time / 2)
+            self._io.write_steps(mask, high=True)
+            self._scheduler.wait(period / 2)
 
     def sleep(self, sleep_time: float):
+        if isinstance(self._gp, RecordingGPIO):
+            return self._gp.sleep(sleep_time)
         if isinstance(self._gp, FakeGPIO):
             return
         time.sleep(sleep_time)
 
     def wire_lengths_at(self, pos: np.ndarray) -> np.array:
         # Work out the wire lengths at the given position
-        wire_lengths = np.zeros(3)
-        for i in range(3):
-            mi = self._motor_positions[i]
-            li = pos + self._link_offsets[i]
-            wire_lengths[i] = np.linalg.norm(mi - li)
-        return wire_lengths
+        return self._geometry.wire_lengths_at(pos)
+
+    def wire_lengths_at_many(self, positions: np.ndarray) -> np.ndarray:
+        # Work out the wire lengths at each of (N, 3) positions
+        return self._geometry.wire_lengths_at_many(positions)
+
+    def step_targets(self, positions: np.ndarray) -> np.ndarray:
+        # The (N, 3) absolute motor step counts that put
+        # the pen closest to each of (N, 3) positions
+        delta_lengths = self.wire_lengths_at_many(positions) - self._init_wire_lengths
+        return np.rint(delta_lengths * self._steps_per_dl).astype(np.int64)
+
+    def positions_from_wire_lengths(self, wire_lengths: np.ndarray) -> np.ndarray:
+        # Work out the (N, 3) pen positions for (N, 3) wire lengths
+        return self._geometry.positions_from_wire_lengths(wire_lengths)
+
+    def positions_from_steps(self, steps: np.ndarray) -> np.ndarray:
+        # Work out the (N, 3) pen positions for (N, 3) absolute motor step counts
+        wire_lengths = self._init_wire_lengths + np.asarray(steps) / self._steps_per_dl
+        return self.positions_from_wire_lengths(wire_lengths)
+
+    @property
+    def geometry(self) -> SpiderGeometry:
+        return self._geometry
 
     @property
     def motor_positions(self) -> np.ndarray:
@@ -265,6 +417,35 @@ class Spider:
     def steps(self) -> List[int]:
         return list(self._steps)
 
+    @property
+    def pins(self) -> Tuple[Tuple[int, int], ...]:
+        return tuple(tuple(p) for p in self._pins)
+
+    @property
+    def steps_per_dl(self) -> int:
+        return self._steps_per_dl
+
+    @property
+    def step_time(self) -> float:
+        return self._step_time
+
+    @property
+    def min_step_time(self) -> float:
+        return self._min_step_time
+
+    @property
+    def acceleration(self) -> float:
+        return self._acceleration
+
+    @property
+    def motion_profile(self) -> str:
+        return self._motion_profile
+
+    @property
+    def timing(self) -> dict:
+        # Achieved vs target step timing so far
+        return self._scheduler.stats
+
     def draw(self):
         import matplotlib.pyplot as plt
 
@@ -0,0 +1,28 @@
+import numpy as np
+from typing import Sequence
+
+
+def make_step_pattern(abs_steps: Sequence[int]) -> np.ndarray:
+    # Returns a (max(abs_steps), 3) boolean array, where row k says which
+    # motors should step on the k'th pulse of a move. The motor with the
+    # most steps steps on every row and the others are spread evenly
+    # between them, so that all motors finish together.
+    #
+    # This is the integer (Bresenham) form of accumulating step_freq
+    # each row and stepping whenever the accumulator reaches 1: motor i
+    # has made floor(k * n_i / n_max) steps after k rows, so it steps on
+    # row k iff that count increases. Exact integer arithmetic guarantees
+    # the totals, with no floating-point drift on long moves.
+    abs_steps = np.asarray(abs_steps, dtype=np.int64)
+    assert abs_steps.ndim == 1, "Expected one step count per motor"
+    assert np.all(abs_steps >= 0), "Step counts should be absolute values"
+
+    max_steps = int(abs_steps.max(initial=0))
+    if max_steps == 0:
+        return np.zeros((0, len(abs_steps)), dtype=bool)
+
+    # Steps made by each motor after each row (including the zeroth row)
+    k = np.arange(max_steps + 1, dtype=np.int64)[:, None]
+    made = (k * abs_steps[None, :]) // max_steps
+
+    return np.diff(made, axis=0).astype(bool)
@@ -0,0 +1,138 @@
+from spider_printer.spider.step_pattern import make_step_pattern
+import numpy as np
+import struct
+from typing import Iterator, Tuple
+
+# Each record is a run of identical step pulses. The code byte holds the
+# step mask in bits 0-2 (bit i => motor i steps) and the direction bits
+# in bits 3-5 (bit 3 + i => motor i winds out, i.e. its dir pin is HIGH).
+# The period is the length of each pulse in microseconds, where 0 means
+# "use the spider's step_time".
+RECORD_DTYPE = np.dtype([("code", "u1"), ("count", "<u4"), ("period_us", "<u4")])
+RECORD_DTYPE_V1 = np.dtype([("code", "u1"), ("count", "<u4")])
+DIR_SHIFT = 3
+STEP_MASK = (1 << DIR_SHIFT) - 1
+
+# Header: magic, version, steps per rotation, start steps (x3), number of records
+HEADER = struct.Struct("<8sHI3qQ")
+MAGIC = b"SPIDERSS"
+VERSION = 2
+
+
+class StepStream:
+
+    def __init__(self, records: np.ndarray, start_steps=(0, 0, 0), steps_per_dl: int = 200):
+        records = np.asarray(records)
+        if records.dtype != RECORD_DTYPE:
+            # Fill in any missing fields (e.g. from version 1 records)
+            converted = np.zeros(len(records), dtype=RECORD_DTYPE)
+            for name in records.dtype.names:
+                converted[name] = records[name]
+            records = converted
+        self._records = records
+        self._start_steps = np.array(start_steps, dtype=np.int64)
+        self._steps_per_dl = steps_per_dl
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records
+
+    @property
+    def start_steps(self) -> np.ndarray:
+        return self._start_steps.copy()
+
+    @property
+    def steps_per_dl(self) -> int:
+        return self._steps_per_dl
+
+    @property
+    def end_steps(self) -> np.ndarray:
+        # Motor step counts after the whole stream has been played
+        return self._start_steps + np.sum(self.step_deltas(), axis=0)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def step_deltas(self) -> np.ndarray:
+        # The (n_records, 3) signed change in step count caused by each record
+        codes = self._records["code"]
+        bits = np.arange(3)
+        masks = (codes[:, None] >> bits) & 1
+        signs = np.where((codes[:, None] >> (DIR_SHIFT + bits)) & 1, 1, -1)
+        return masks * signs * self._records["count"].astype(np.int64)[:, None]
+
+    @property
+    def duration(self) -> float:
+        # Time (s) to play the stream, counting unset periods as zero
+        return float(np.sum(self._records["count"] * self._records["period_us"].astype(float))) / 1e6
+
+    def runs(self) -> Iterator[Tuple[Tuple[int, int, int], int, int, float]]:
+        # Yields (directions, step bitmask, count, period) for each run of pulses,
+        # where the period is in seconds (or None to use the spider's step_time)
+        for code, count, period_us in zip(self._records["code"].tolist(),
+                                          self._records["count"].tolist(),
+                                          self._records["period_us"].tolist()):
+            directions = tuple(1 if (code >> (DIR_SHIFT + i)) & 1 else -1 for i in range(3))
+            yield directions, code & STEP_MASK, count, (period_us / 1e6 if period_us > 0 else None)
+
+    def save(self, fname: str):
+        with open(fname, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self._steps_per_dl,
+                                *self._start_steps.tolist(), len(self._records)))
+            f.write(self._records.tobytes())
+
+    @staticmethod
+    def load(fname: str) -> "StepStream":
+        with open(fname, "rb") as f:
+            magic, version, steps_per_dl, s0, s1, s2, n = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{fname} is not a step stream file")
+            if version not in (1, VERSION):
+                raise ValueError(f"Unsupported step stream version {version} in {fname}")
+            records = np.fromfile(f, dtype=RECORD_DTYPE if version == VERSION else RECORD_DTYPE_V1, count=n)
+        if len(records) != n:
+            raise ValueError(f"Step stream {fname} is truncated ({len(records)}/{n} records)")
+        return StepStream(records, start_steps=(s0, s1, s2), steps_per_dl=steps_per_dl)
+
+    @staticmethod
+    def from_step_targets(targets: np.ndarray, start_steps=(0, 0, 0), steps_per_dl: int = 200,
+                          periods: np.ndarray = None) -> "StepStream":
+        # Build the stream that moves the motors through each of
+        # the (N, 3) absolute step targets in turn. If given, periods
+        # holds the time (s) for each pulse, with one entry per step of
+        # the fastest motor over each move that changes the steps.
+        targets = np.asarray(targets, dtype=np.int64).reshape(-1, 3)
+        start_steps = np.array(start_steps, dtype=np.int64)
+        deltas = np.diff(np.vstack([start_steps[None, :], targets]), axis=0)
+        deltas = deltas[np.any(deltas != 0, axis=1)]
+
+        # Encode each move as one code per pulse
+        codes = []
+        for delta in deltas:
+            dir_bits = int(np.sum((delta >= 0) << np.arange(3)))
+            pattern = make_step_pattern(np.abs(delta))
+            codes.append((dir_bits << DIR_SHIFT) | (pattern @ (1 << np.arange(3))).astype(np.uint8))
+        codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.uint8)
+
+        periods_us = np.zeros(len(codes), dtype=np.uint32)
+        if periods is not None:
+            assert len(periods) == len(codes), f"Expected {len(codes)} step periods, got {len(periods)}"
+            periods_us[:] = np.maximum(np.rint(np.asarray(periods) * 1e6), 1)
+
+        # Run-length encode identical consecutive pulses
+        new_run = np.ones(len(codes), dtype=bool)
+        new_run[1:] = (codes[1:] != codes[:-1]) | (periods_us[1:] != periods_us[:-1])
+        run_starts = np.flatnonzero(new_run)
+        records = np.zeros(len(run_starts), dtype=RECORD_DTYPE)
+        records["code"] = codes[run_starts]
+        records["count"] = np.diff(np.append(run_starts, len(codes)))
+        records["period_us"] = periods_us[run_starts]
+
+        return StepStream(records, start_steps=start_steps, steps_per_dl=steps_per_dl)
+
+
+def compile_route(spider, positions: np.ndarray) -> StepStream:
+    # Compile the (N, 3) route for the given spider, starting from its current steps
+    return StepStream.from_step_targets(spider.step_targets(positions),
+                                        start_steps=spider.steps,
+                                        steps_per_dl=spider.steps_per_dl)
@@ -0,0 +1,92 @@
+from spider_printer.paths.cache import RouteCache, cache_key, cached_file, cached_route, code_digest, file_digest
+from spider_printer.paths.route import read_route, write_route
+import numpy as np
+import os
+
+
+def test_cache_key(tmp_path):
+    (tmp_path / "a").write_bytes(b"image")
+    (tmp_path / "b").write_bytes(b"image")
+    (tmp_path / "c").write_bytes(b"other")
+
+    key = cache_key("gen", {"x": 1, "y": [2, 3]}, files=[tmp_path / "a"])
+    assert key == cache_key("gen", {"y": [2, 3], "x": 1}, files=[tmp_path / "b"])  # Only contents matter
+    assert key != cache_key("gen", {"x": 1, "y": [2, 3]}, files=[tmp_path / "c"])
+    assert key != cache_key("gen", {"x": 2, "y": [2, 3]}, files=[tmp_path / "a"])
+    assert key != cache_key("other", {"x": 1, "y": [2, 3]}, files=[tmp_path / "a"])
+
+
+def test_cache_key_code():
+    # Keyed on the source of the files defining the code
+    assert code_digest(read_route) == file_digest(read_route.__code__.co_filename)
+    key = cache_key("gen", code=[read_route])
+    assert key == cache_key("gen", code=[write_route])  # Same module
+    assert key != cache_key("gen", code=[cache_key])
+    assert key != cache_key("gen")
+
+
+def test_cached_route(tmp_path):
+    cache = RouteCache(tmp_path / "cache")
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return np.random.random((100, 2))
+
+    first = cached_route(generate, "gen", {"n": 100}, cache=cache)
+    again = cached_route(generate, "gen", {"n": 100}, cache=cache)
+    other = cached_route(generate, "gen", {"n": 101}, cache=cache)
+    assert len(calls) == 2
+    assert np.array_equal(first, again)
+    assert not np.array_equal(first, other)
+    assert not any(name.startswith(".") for name in os.listdir(cache.directory))  # No temporary files left
+
+
+def test_unseeded_routes_are_not_cached(tmp_path):
+    cache = RouteCache(tmp_path / "cache")
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return np.random.random((100, 2))
+
+    first = cached_route(generate, "gen", {"seed": None}, cache=cache)
+    again = cached_route(generate, "gen", {"seed": None}, cache=cache)
+    assert len(calls) == 2
+    assert not np.array_equal(first, again)
+    assert os.listdir(cache.directory) == []
+
+    cached_route(generate, "gen", {"seed": 1}, cache=cache)
+    cached_route(generate, "gen", {"seed": 1}, cache=cache)
+    assert len(calls) == 3
+
+
+def test_cached_file(tmp_path):
+    cache = RouteCache(tmp_path / "cache")
+    route = np.random.random((10, 2))
+    generate = lambda fname: write_route(fname, route)
+
+    assert not cached_file(tmp_path / "out.xy", generate, "gen", cache=cache)
+    os.unlink(tmp_path / "out.xy")
+    assert cached_file(tmp_path / "out.xy", generate, "gen", cache=cache)
+    assert np.allclose(read_route(tmp_path / "out.xy"), route)
+
+    # Different formats are cached separately
+    assert not cached_file(tmp_path / "out.xyb", generate, "gen", cache=cache)
+
+
+def test_lru_eviction(tmp_path):
+    source = tmp_path / "source"
+    source.write_bytes(b"x" * 1000)
+    cache = RouteCache(tmp_path / "cache", max_bytes=3500)
+
+    for i, key in enumerate("abc"):
+        cache.put(key, source)
+        os.utime(cache.path(key), ns=(i * 10**9, i * 10**9))
+
+    # Using a makes b the least recently used, so it goes when d is added
+    assert cache.get("a") is not None
+    cache.put("d", source)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.size() == 3000
@@ -0,0 +1,45 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.checkpoint import save_checkpoint, load_checkpoint, remove_checkpoint
+import numpy as np
+import os
+
+
+def test_checkpoint_round_trip(tmp_path):
+    fname = tmp_path / "drawing.checkpoint"
+    assert load_checkpoint(fname) is None
+
+    save_checkpoint(fname, {"index": 1, "steps": [1, 2, 3]})
+    save_checkpoint(fname, {"index": 2, "steps": [4, 5, 6]})
+    assert load_checkpoint(fname) == {"index": 2, "steps": [4, 5, 6]}
+    assert os.listdir(tmp_path) == ["drawing.checkpoint"]  # No temporary files left
+
+    remove_checkpoint(fname)
+    assert load_checkpoint(fname) is None
+
+
+def test_resume_drawing(tmp_path):
+    route = np.random.random((20, 3))
+    route[:, 2] = -1 - route[:, 2]
+    fname = tmp_path / "drawing.checkpoint"
+
+    # Draw half the route, then stop
+    s = Spider(gp=FakeGPIO())
+    for i, r in enumerate(route[:10]):
+        s.position = r
+        save_checkpoint(fname, {"index": i + 1, "steps": s.steps})
+    s.auto_reset = False
+    del s
+
+    # Pick up where we left off
+    checkpoint = load_checkpoint(fname)
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    s.restore_steps(checkpoint["steps"])
+    assert max(abs(s.position - route[9])) < 0.1
+    for r in route[checkpoint["index"]:]:
+        s.position = r
+
+    s_ref = Spider(gp=FakeGPIO(), auto_reset=False)
+    for r in route:
+        s_ref.position = r
+    assert s.steps == s_ref.steps
@@ -0,0 +1,64 @@
+from spider_printer.paths.generation.crosshatch import CrossHatchSquare, downsample_mean, iter_crosshatch_bands, \
+    image_to_crosshatch_path
+from spider_printer.paths.route import read_route
+import numpy as np
+import pytest
+
+
+def grid_path_reference(grid):
+    # The crosshatch grid path built a cell at a time, as it used to be
+    grid_path = []
+    for y in range(grid.shape[1]):
+        x_range = list(range(grid.shape[0]) if y % 2 == 0 else range(grid.shape[0]-1, -1, -1))
+        for x in x_range:
+            end = [1, 0] if y % 2 == 0 else [0, 0]
+            start = [0, 0] if y % 2 == 0 else [1, 0]
+            if x == x_range[-1]:
+                end[1] = 1
+            c_path = np.array(CrossHatchSquare(start=start, end=end, lines=int(grid[x, y])).path)
+            c_path[:, 0] += x
+            c_path[:, 1] += y
+            grid_path.extend(c_path)
+    return np.array(grid_path)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (1, 5), (5, 1), (4, 4), (7, 6), (30, 17)])
+def test_crosshatch_grid_path_unchanged(shape):
+    grid = np.random.default_rng(sum(shape)).random(shape) * 10
+    grid[0, 0] = 0  # Always at least two lines
+    path = CrossHatchSquare.crosshatch_grid_path(grid)
+    assert path.dtype == np.float64
+    assert np.array_equal(path, grid_path_reference(grid))
+
+
+def test_crosshatch_grid_path_integer_grid():
+    grid = np.arange(20).reshape(4, 5) % 7
+    assert np.array_equal(CrossHatchSquare.crosshatch_grid_path(grid), grid_path_reference(grid))
+
+
+@pytest.mark.parametrize("band_rows, workers", [(1, 1), (4, 1), (5, 2), (100, 2)])
+def test_crosshatch_bands(band_rows, workers):
+    grid = np.random.default_rng(band_rows).random((13, 22)) * 10
+    path = np.concatenate(list(iter_crosshatch_bands(grid, band_rows=band_rows, workers=workers)))
+    assert np.array_equal(path, CrossHatchSquare.crosshatch_grid_path(grid))
+
+
+def test_downsample_mean():
+    im = np.arange(35, dtype=float).reshape(5, 7)
+    small = downsample_mean(im, 2)
+    assert small.shape == im[::2, ::2].shape
+    assert small[0, 0] == np.mean(im[:2, :2])
+    assert small[2, 3] == im[4, 6]
+    assert small[1, 3] == np.mean(im[2:4, 6])
+    assert np.array_equal(downsample_mean(im, 1), im)
+
+
+def test_image_to_crosshatch_path(tmp_path):
+    import imageio.v3 as iio
+    im = np.random.default_rng(0).integers(0, 256, (40, 30, 3), dtype=np.uint8)
+    iio.imwrite(tmp_path / "image.png", im)
+
+    image_to_crosshatch_path(tmp_path / "image.png", downsampling=3, save_as=str(tmp_path / "cross.xyb"), band_rows=4, workers=2)
+    grey = np.mean(im, axis=-1)
+    grid = (1.0 - downsample_mean(grey / np.max(grey), 3)) * 10
+    assert np.array_equal(read_route(tmp_path / "cross.xyb"), CrossHatchSquare.crosshatch_grid_path(grid))
@@ -0,0 +1,27 @@
+from spider_printer.spider.dry_run import dry_run, format_report
+from spider_printer.spider.spider import HEIGHT
+import numpy as np
+import pytest
+
+
+def circle_route(n):
+    theta = np.linspace(0, 2 * np.pi, n)
+    return np.array([np.cos(theta), np.sin(theta), np.full(n, -HEIGHT)]).T
+
+
+def test_dry_run_report():
+    report = dry_run(circle_route(50), call_time=0.0, step_time=0.01)
+    assert report["points"] == 50
+    assert report["pulses"] == pytest.approx(report["time_s"] / 0.01)
+    assert sum(report["segment_times_s"]) == pytest.approx(report["time_s"], abs=0.01)
+    assert report["travel_mm"] > 0
+    assert report["slowest_segments"][0]["index"] == 0  # Moving out to the circle
+    assert "Estimated time" in format_report(report)
+
+
+def test_dry_run_planner_is_faster():
+    settings = dict(motion_profile="trapezoid", min_step_time=0.002)
+    per_point = dry_run(circle_route(200), **settings)
+    planned = dry_run(circle_route(200), plan=True, **settings)
+    assert list(planned["steps_per_motor"]) == list(per_point["steps_per_motor"])
+    assert planned["time_s"] < per_point["time_s"]
@@ -0,0 +1,39 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+import numpy as np
+
+
+class CountingGPIO(FakeGPIO):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def output(self, pin, value):
+        super().output(pin, value)
+        self.calls.append((pin, value))
+
+
+def test_one_call_per_edge():
+    gp = CountingGPIO()
+    s = Spider(gp=gp, auto_reset=False)
+    s.position = s.position + np.array([0.3, 0.2, 0.0])
+
+    # One call for the directions, then one per edge
+    rows = max(abs(x) for x in s.steps)
+    assert len(gp.calls) == 1 + 2 * rows
+    assert gp.calls[0][0] == [3, 27, 11]
+    assert all(isinstance(pin, list) for pin, value in gp.calls)
+
+    # Each edge writes all of its motors' step pins at once
+    n_motor_edges = sum(len(pin) for pin, value in gp.calls[1:])
+    assert n_motor_edges == 2 * sum(abs(x) for x in s.steps)
+
+
+def test_tension_single_motor():
+    gp = CountingGPIO()
+    s = Spider(gp=gp, auto_reset=False)
+    s.tension(0.1, motors=[1])
+    assert gp.calls[0] == ([27], [gp.LOW])
+    assert all(pin == [17] for pin, value in gp.calls[1:])
+    assert len(gp.calls) == 1 + 2 * 20
@@ -0,0 +1,33 @@
+from spider_printer.paths.generation.img_to_line import image_to_line, line_density
+import numpy as np
+
+
+def test_image_to_line_moves():
+    density = np.random.default_rng(0).random((60, 80))
+    route = image_to_line(density, iterations=5000, max_step=3, seed=1)
+    assert route.shape == (5000, 2)
+    assert np.array_equal(route[0], [30, 40])
+    assert np.all(np.abs(np.diff(route, axis=0)) <= 3)
+    assert np.all((route >= 0) & (route < [60, 80]))
+    assert np.array_equal(route, image_to_line(density, iterations=5000, max_step=3, seed=1))
+
+
+def test_image_to_line_density():
+    # Never moves onto white pixels, and visits dark pixels
+    # in proportion to their darkness
+    density = np.zeros((40, 40))
+    density[:, :20] = 1.0
+    density[:, 20:30] = 0.25
+    route = image_to_line(density, iterations=200000, max_step=4, seed=2, batch_size=1000)
+    columns = route[:, 1]
+    assert np.all(columns < 30)
+    ratio = np.mean(columns < 20) / np.mean((columns >= 20) & (columns < 30)) * 10 / 20
+    assert 3 < ratio < 5
+
+
+def test_line_density(tmp_path):
+    import imageio.v3 as iio
+    im = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+    iio.imwrite(tmp_path / "image.png", im)
+    grey = np.mean(im, axis=-1)
+    assert np.allclose(line_density(tmp_path / "image.png", contrast=2.0), (1 - grey / grey.max()) ** 2)
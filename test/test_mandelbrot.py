@@ -0,0 +1,40 @@
+from spider_printer.paths.generation.mandelbrot import escape_time
+from spider_printer.paths.generation.mandel_walk import mandel_walk
+import numpy as np
+
+
+def mandel_iter(z):
+    # The original per-point loop
+    f = 0.0
+    for n in range(100):
+        f = f**2 + z
+        if abs(f) > 2.0:
+            return n
+    return n
+
+
+def test_escape_time():
+    grid = np.add.outer(np.linspace(-2, 1, 101), 1j * np.linspace(-1.5, 1.5, 77))
+    expected = np.array([[mandel_iter(z) for z in row] for row in grid])
+
+    assert np.array_equal(escape_time(grid), expected)
+    assert escape_time(grid).shape == grid.shape
+    assert escape_time(grid[3, 5]) == expected[3, 5]
+    assert escape_time(0j) == 99
+    assert escape_time(0j, max_iter=10) == 9
+    assert escape_time(np.zeros((0,), dtype=complex)).shape == (0,)
+
+
+def test_mandel_walk():
+    # The original walk
+    path = [0.15 - 0.6j]
+    x, dx = path[-1], 0.01
+    for n in range(2000):
+        x += dx
+        dx *= np.exp(0.01 * 40.0j)
+        x = x * 1.01 if mandel_iter(x) > 50 else x / 1.01
+        path.append(x)
+
+    walk = mandel_walk(2000)
+    assert walk.shape == (2001, 2)
+    assert np.allclose(walk[:, 0] + 1j * walk[:, 1], path, rtol=0, atol=1e-12)
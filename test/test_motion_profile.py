@@ -0,0 +1,73 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.motion_profile import ramp_speeds, step_periods
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("profile", ["trapezoid", "s-curve"])
+def test_profile_shape(profile):
+    periods = step_periods(2000, 0.01, min_step_time=0.002, accel=1000.0, profile=profile)
+
+    # Start and end slow, reach full speed, never exceed it
+    assert periods[0] == pytest.approx(0.01)
+    assert periods[-1] == pytest.approx(0.01)
+    assert min(periods) == pytest.approx(0.002)
+    assert np.all(periods >= 0.002 - 1e-12)
+
+    # Symmetric, speeding up then slowing down
+    assert np.allclose(periods, periods[::-1])
+    half = periods[:1000]
+    assert np.all(np.diff(half) <= 1e-12)
+
+
+def test_profile_short_move():
+    # Too short to reach full speed, but still faster than constant
+    periods = step_periods(10, 0.01, min_step_time=0.001, accel=1000.0)
+    assert min(periods) > 0.001
+    assert sum(periods) < 10 * 0.01
+
+
+def test_constant_profile():
+    assert np.all(step_periods(10, 0.01, min_step_time=0.001, profile="constant") == 0.01)
+    assert np.all(step_periods(10, 0.01) == 0.01)
+
+
+@pytest.mark.parametrize("profile", ["trapezoid", "s-curve"])
+def test_spider_profile(profile):
+    target = np.array((0.5, -0.5, -3))
+
+    s_const = Spider(gp=FakeGPIO(), auto_reset=False)
+    s_const.position = target
+
+    s = Spider(gp=FakeGPIO(), auto_reset=False, motion_profile=profile, min_step_time=0.002)
+    s.position = target
+    s.tension(0.5)
+
+    # Same moves, made faster
+    assert s.steps == s_const.steps
+    assert max(abs(s.position - target)) < 0.1
+    assert s.timing["target_s"] < 0.5 * s_const.timing["target_s"]
+
+
+def test_spider_unknown_profile():
+    with pytest.raises(ValueError):
+        Spider(gp=FakeGPIO(), auto_reset=False, motion_profile="bouncy")
+
+
+@pytest.mark.parametrize("profile", ["trapezoid", "s-curve"])
+@pytest.mark.parametrize("v_from", [50.0, 100.0, 450.0])
+def test_ramp_acceleration_limit(profile, v_from):
+    # dv/dt = v*dv/ds never goes over accel (checked on a fine grid)
+    distance = np.linspace(0, 2000, 200001)
+    v = ramp_speeds(v_from, distance, 500.0, 1000.0, profile)
+    assert v[-1] == pytest.approx(500.0)
+    assert np.max(v * np.gradient(v, distance)) <= 1000.0 * (1 + 1e-4)
+
+
+def test_s_curve_step_acceleration():
+    # Nor does the speed change faster than accel between steps
+    periods = step_periods(2000, 0.01, min_step_time=0.002, accel=1000.0, profile="s-curve")
+    v = 1.0 / periods
+    dv_dt = np.diff(v) / (0.5 * (periods[1:] + periods[:-1]))
+    assert np.max(np.abs(dv_dt)) <= 1000.0 * 1.01
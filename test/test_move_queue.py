@@ -0,0 +1,121 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+import numpy as np
+import pytest
+import threading
+
+
+def random_route(n):
+    route = np.random.random((n, 3))
+    route[:, 2] = -1 - route[:, 2]
+    return route
+
+
+def test_enqueue_matches_position():
+    route = random_route(50)
+
+    s = Spider(gp=FakeGPIO(), auto_reset=False, queue_size=4)
+    for r in route:
+        s.enqueue(r)
+    s.wait()
+
+    s_ref = Spider(gp=FakeGPIO(), auto_reset=False)
+    for r in route:
+        s_ref.position = r
+
+    assert s.steps == s_ref.steps
+    assert max(abs(s.position - route[-1])) < 0.1
+
+
+def test_position_waits_for_queue():
+    route = random_route(10)
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    for r in route:
+        s.enqueue(r)
+
+    # Setting the position directly happens after the queued moves
+    s.position = route[0]
+    assert max(abs(s.position - route[0])) < 0.1
+    assert list(s.step_targets(route[:1])[0]) == s.steps
+
+
+class BrokenGPIO(FakeGPIO):
+
+    def __init__(self):
+        super().__init__()
+        self.broken = False
+
+    def output(self, pin, value):
+        if self.broken:
+            raise IOError("GPIO failure")
+
+
+def test_stepping_errors_are_raised():
+    gp = BrokenGPIO()
+    s = Spider(gp=gp, auto_reset=False)
+    gp.broken = True
+    for r in random_route(5):
+        s.enqueue(r)
+    with pytest.raises(IOError):
+        s.wait()
+
+    # The queue is dropped, and we can carry on from where the motors got to
+    gp.broken = False
+    s.wait()
+    x = random_route(1)[0]
+    s.position = x
+    assert max(abs(s.position - x)) < 0.1
+
+
+class CountingGPIO(FakeGPIO):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.moving = threading.Event()
+        self.gate = None
+
+    def output(self, pin, value):
+        # Optionally hold up the motors until the gate is opened
+        if self.gate is not None:
+            self.moving.set()
+            self.gate.wait()
+        self.calls += 1
+
+
+class DeletedSpider(Spider):
+
+    def __init__(self, deleted, **kwargs):
+        super().__init__(**kwargs)
+        self._deleted = deleted
+
+    def __del__(self):
+        super().__del__()
+        self._deleted.append(self.steps)
+
+
+def test_deleting_with_queued_moves():
+    # The stepping thread may drop the last reference to the spider, and
+    # so be the one to reset it, with moves still queued
+    route = random_route(20)
+    deleted = []
+    gp = CountingGPIO()
+    s = DeletedSpider(deleted, gp=gp, auto_reset=True)
+    gp.gate = threading.Event()
+    for r in route:
+        s.enqueue(r)
+    thread = s._stepping_thread
+    gp.moving.wait()  # So only the stepping thread is left holding the spider
+    del s
+    gp.gate.set()
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+
+    # All the queued moves were made, and then the reset
+    gp_ref = CountingGPIO()
+    s_ref = Spider(gp=gp_ref, auto_reset=False)
+    for r in route:
+        s_ref.position = r
+    s_ref.position = s_ref._init_position
+    assert deleted == [[0, 0, 0]]
+    assert gp.calls == gp_ref.calls
@@ -0,0 +1,67 @@
+from spider_printer.paths import optimize
+from spider_printer.paths.optimize import split_strokes, optimize_route
+import numpy as np
+import pytest
+
+
+def make_strokes(n, seed=0):
+    # n short horizontal strokes scattered in a 100x100 square
+    rng = np.random.default_rng(seed)
+    strokes = []
+    for x, y in rng.random((n, 2)) * 100:
+        strokes.append(np.column_stack([x + np.linspace(0, 1, 11), np.full(11, y)]))
+    return strokes
+
+
+def test_split_strokes():
+    strokes = make_strokes(5)
+    route = np.concatenate(strokes)
+    assert split_strokes(route) == [(11 * i, 11 * (i + 1)) for i in range(5)]
+    assert split_strokes(route, split_distance=1000) == [(0, 55)]
+
+
+@pytest.mark.parametrize("kd_tree", [True, False])
+def test_optimize_route(monkeypatch, kd_tree):
+    if not kd_tree:
+        monkeypatch.setattr(optimize, "cKDTree", None)
+    strokes = make_strokes(200)
+    route = np.concatenate(strokes)
+    optimized, report = optimize_route(route)
+
+    assert report["strokes"] == 200
+    assert report["travel_after"] < report["travel_before"] / 3
+    assert np.isclose(report["travel_saved"], report["travel_before"] - report["travel_after"])
+
+    # Every stroke is drawn exactly once, maybe backwards
+    assert optimized.shape == route.shape
+    assert np.allclose(optimized[0], route[0])
+    pieces = [optimized[a:b] for a, b in split_strokes(optimized, split_distance=0.5)]
+    assert len(pieces) <= 200
+    drawn = {tuple(np.round(p, 9)) for stroke in pieces for p in stroke}
+    assert drawn == {tuple(np.round(p, 9)) for p in route}
+
+    # And the report matches the route (the strokes are all of length 1)
+    length = np.sum(np.linalg.norm(np.diff(optimized, axis=0), axis=1))
+    assert np.isclose(length - 200, report["travel_after"])
+
+
+def test_two_opt_improves_nearest_neighbour():
+    route = np.concatenate(make_strokes(300, seed=1))
+    _, greedy = optimize_route(route, use_two_opt=False)
+    _, improved = optimize_route(route)
+    assert improved["travel_after"] <= greedy["travel_after"]
+
+
+def test_reverses_strokes():
+    # The second stroke is nearer from its far end
+    route = np.array([[0, 0], [1, 0], [10, 0], [11, 0], [5, 0.1], [2, 0.1]])
+    optimized, report = optimize_route(route, split_distance=2)
+    assert np.allclose(optimized, [[0, 0], [1, 0], [2, 0.1], [5, 0.1], [10, 0], [11, 0]])
+    assert report["travel_after"] < report["travel_before"]
+
+
+def test_optimize_short_routes():
+    optimized, report = optimize_route(np.zeros((0, 2)))
+    assert optimized.shape == (0, 2) and report["strokes"] == 0
+    optimized, report = optimize_route([[1.0, 2.0]])
+    assert np.array_equal(optimized, [[1.0, 2.0]]) and report["travel_saved"] == 0
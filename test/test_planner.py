@@ -0,0 +1,75 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.motion_profile import ramp_speeds, step_periods
+from spider_printer.spider.planner import junction_speeds, plan_route, plan_speeds
+import numpy as np
+import pytest
+
+
+def make_spider():
+    return Spider(gp=FakeGPIO(), auto_reset=False, motion_profile="trapezoid",
+                  min_step_time=0.001, acceleration=2000.0)
+
+
+def test_junction_speeds():
+    deltas = [[10, 0, 0], [10, 0, 0], [0, 10, 0], [-10, 0, 0], [10, 0, 0]]
+    v = junction_speeds(deltas, v_start=100.0, v_max=1000.0, accel=2000.0, junction_deviation=5.0)
+
+    # Straight on at full speed, slower round corners, stop to reverse
+    assert v[0] == 1000.0
+    assert 100.0 < v[1] < 1000.0
+    assert v[2] == v[1]
+    assert v[3] == 100.0
+
+
+def test_planned_line_is_faster():
+    s = make_spider()
+    x0 = s.position
+    route = x0 + np.linspace(0, 1, 200)[:, None] * np.array([1.0, 0.5, 0.0])
+
+    stream = plan_route(s, route)
+    s.play(stream)
+
+    # Same end point as moving point-by-point
+    s_ref = make_spider()
+    for r in route:
+        s_ref.position = r
+    assert s.steps == s_ref.steps
+
+    # But without stopping at every point
+    assert abs(s.timing["target_s"] - stream.duration) < 1e-3
+    assert s.timing["target_s"] < 0.5 * s_ref.timing["target_s"]
+
+
+def test_planned_reversal_stops():
+    s = make_spider()
+    x0 = s.position
+    route = [x0 + (1, 0, 0), x0]
+    stream = plan_route(s, route, lookahead=4)
+    periods = stream.records["period_us"]
+
+    # Starts, turns around and ends at the standstill-safe speed
+    assert periods[0] == periods[-1] == 10000
+    turn = np.flatnonzero(np.diff(stream.records["code"] >> 3))[0]
+    assert periods[turn] == periods[turn + 1] == 10000
+
+
+@pytest.mark.parametrize("profile", ["trapezoid", "s-curve"])
+def test_planned_speeds_join_up(profile):
+    # Each move starts and ends at its planned speeds, and the speed never
+    # jumps across a junction by more than a step's ramp
+    rng = np.random.default_rng(0)
+    move_steps = rng.integers(1, 30, 300)
+    limits = rng.uniform(100.0, 1000.0, 299)
+    entry, exit = plan_speeds(move_steps, limits, 100.0, 1000.0, lookahead=8, v_max=1000.0, profile=profile)
+
+    moves = [1.0 / step_periods(n, 0.01, min_step_time=0.001, accel=1000.0, profile=profile,
+                                entry_step_time=1.0 / v_in, exit_step_time=1.0 / v_out)
+             for n, v_in, v_out in zip(move_steps, entry, exit)]
+    assert np.allclose([v[0] for v in moves], entry)
+    assert np.allclose([v[-1] for v in moves], exit)
+    assert entry[0] == exit[-1] == 100.0
+
+    last, first = exit[:-1], entry[1:]
+    slower, faster = np.minimum(last, first), np.maximum(last, first)
+    assert np.all(faster <= ramp_speeds(slower, 1, 1000.0, 1000.0, profile) * (1 + 1e-9))
@@ -0,0 +1,98 @@
+from spider_printer.paths.preview import decimate, rasterize, write_png, save_preview, route_segments, plot_route
+import numpy as np
+import pytest
+
+
+def test_rasterize_square():
+    route = np.array([[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]])
+    image = rasterize(route, width=11)
+    assert image.shape == (11, 11)
+
+    # The outline is black, and the inside white
+    outline = np.ones((11, 11), dtype=bool)
+    outline[1:-1, 1:-1] = False
+    assert np.all(image[outline] == 0)
+    assert np.all(image[~outline] == 255)
+
+
+def test_rasterize_alpha():
+    # Going over the same line again makes it darker
+    once = rasterize(np.array([[0, 0], [10, 0]]), width=11, height=3, alpha=0.5, bounds=((0, 0), (10, 2)))
+    twice = rasterize(np.array([[0, 0], [10, 0], [0, 0]]), width=11, height=3, alpha=0.5, bounds=((0, 0), (10, 2)))
+    assert np.all(once[-1] < 255) and np.all(once[:-1] == 255)
+    assert np.all(twice[-1, :-1] < once[-1, :-1])
+
+
+def test_rasterize_empty(tmp_path):
+    # A blank image, rather than an error
+    image = rasterize(np.zeros((0, 2)), width=20)
+    assert image.shape == (20, 20) and np.all(image == 255)
+    assert rasterize([], width=20, height=10).shape == (10, 20)
+    assert save_preview(np.zeros((0, 2)), str(tmp_path / "empty.png"), width=20) == (20, 20)
+
+
+def test_rasterize_flat_routes():
+    # A horizontal line fills a one pixel high image
+    image = rasterize([[0, 0], [1, 0]], width=50)
+    assert image.shape == (1, 50) and np.all(image == 0)
+
+    # A vertical line is as tall as allowed, down the middle
+    image = rasterize([[0, 0], [0, 1]], width=50)
+    assert image.shape == (500, 50)
+    dark = np.argwhere(image < 255)
+    assert len(dark) == 500 and np.all(np.abs(dark[:, 1] - 24.5) <= 0.5)
+
+    # A single point is one pixel, in the middle
+    image = rasterize([[3, 4]], width=21)
+    assert image.shape == (21, 21)
+    assert list(map(list, np.argwhere(image < 255))) == [[10, 10]]
+
+    # And a line in a given (wider) image is centred
+    image = rasterize([[0, 0], [0, 10]], width=21, height=11)
+    assert set(np.argwhere(image < 255)[:, 1]) == {10}
+
+
+def test_write_png(tmp_path):
+    import imageio.v3 as iio
+    image = np.random.default_rng(0).integers(0, 256, (30, 40), dtype=np.uint8)
+    write_png(tmp_path / "image.png", image)
+    assert np.array_equal(iio.imread(tmp_path / "image.png"), image)
+
+    route = np.cumsum(np.random.default_rng(1).normal(size=(10000, 2)), axis=0)
+    width, height = save_preview(route, tmp_path / "route.png", width=200)
+    assert iio.imread(tmp_path / "route.png").shape == (height, width)
+
+
+def test_decimate():
+    t = np.linspace(0, 2 * np.pi, 100001)
+    route = np.column_stack([np.cos(t), np.sin(t)])
+    assert np.array_equal(decimate(route, max_segments=10**6), route_segments(route))
+
+    # Merging points within a pixel
+    segments = decimate(route, pixel=0.01)
+    assert len(segments) < 2000
+    assert np.allclose(segments[0, 0], route[0]) and np.allclose(segments[-1, 1], route[-1])
+    assert np.allclose(segments[1:, 0], segments[:-1, 1])  # Still joined up
+
+    # Only the visible part
+    segments = decimate(route, view=((0.9, 2), (-1, 1)), pixel=0.001)
+    assert np.all(np.max(segments[:, :, 0], axis=1) >= 0.9)
+
+    # At most max_segments
+    assert len(decimate(route, max_segments=1000)) <= 1000
+
+
+def test_plot_route():
+    plt = pytest.importorskip("matplotlib.pyplot")
+    fig, ax = plt.subplots()
+    route = np.cumsum(np.random.default_rng(2).normal(size=(200000, 2)), axis=0)
+    collection = plot_route(route, ax=ax, max_segments=5000)
+    assert len(ax.collections) == 1 and len(ax.lines) == 0
+    assert 0 < len(collection.get_segments()) <= 5000
+
+    # Zooming in redraws just the visible part
+    ax.set_xlim(route[1000, 0] - 1, route[1000, 0] + 1)
+    ax.set_ylim(route[1000, 1] - 1, route[1000, 1] + 1)
+    segments = np.array(collection.get_segments())
+    assert np.all(np.max(segments[:, :, 0], axis=1) >= route[1000, 0] - 1)
+    plt.close(fig)
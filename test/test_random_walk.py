@@ -0,0 +1,44 @@
+from spider_printer.paths.generation.random_walk import clamped_walk, iter_random_walk, random_walk
+import numpy as np
+import pytest
+
+
+def loop_clamped_walk(x, steps, max_d):
+    # The original one step at a time loop
+    positions, top, bottom = [], [], []
+    for i, s in enumerate(steps):
+        x += s
+        if x > max_d:
+            x = max_d
+            top.append(i)
+        if x < -max_d:
+            x = -max_d
+            bottom.append(i)
+        positions.append(x)
+    return positions, top, bottom
+
+
+@pytest.mark.parametrize("start, max_d, window", [(3, 8, 100), (0, 8, None), (8, 8, 7), (-2, 2, None), (0, 20, None)])
+def test_clamped_walk(start, max_d, window):
+    steps = np.random.default_rng(0).integers(-1, 2, 10000)
+    positions, hit_top, hit_bottom = clamped_walk(start, steps, max_d, window=window)
+    expected, top, bottom = loop_clamped_walk(start, steps, max_d)
+    assert list(positions) == expected
+    assert list(hit_top) == top and list(hit_bottom) == bottom
+
+
+def test_random_walk_stops_at_origin():
+    for seed in range(5):
+        walk = random_walk(max_d=5, seed=seed) * 5
+        assert np.array_equal(walk[0], [0, 0]) and np.array_equal(walk[-1], [0, 0])
+        assert np.all(np.abs(np.diff(walk, axis=0)) <= 1)
+
+        # Only stopping back at the origin after reaching all the walls
+        walls = [walk[:, 0] == 5, walk[:, 0] == -5, walk[:, 1] == 5, walk[:, 1] == -5]
+        assert max(np.argmax(w) for w in walls) < len(walk) - 1
+
+
+def test_random_walk_max_points():
+    chunks = list(iter_random_walk(max_d=1000, max_points=25000, chunk_size=10000, seed=0))
+    assert [len(c) for c in chunks] == [1, 10000, 10000, 4999]
+    assert np.max(np.abs(np.concatenate(chunks))) <= 1
@@ -0,0 +1,46 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import RecordingGPIO
+import numpy as np
+import pytest
+
+
+def random_route(n):
+    route = np.random.random((n, 3))
+    route[:, 2] = -1 - route[:, 2]
+    return route
+
+
+def test_trace_rebuilds_steps():
+    gp = RecordingGPIO()
+    s = Spider(gp=gp, auto_reset=False)
+    for r in random_route(10):
+        s.position = r
+
+    assert list(gp.step_counts(s.pins)) == s.steps
+    assert len(gp.step_times(s.pins[0][0])) > 0
+
+
+def test_simulated_clock_duration():
+    gp = RecordingGPIO()
+    s = Spider(gp=gp, auto_reset=False, step_time=0.01)
+    s.position = s.position + np.array([0.5, 0.0, 0.0])
+
+    # The trace spans the whole move (less the final half step)
+    rows = max(abs(x) for x in s.steps)
+    assert gp.duration == pytest.approx(0.01 * rows - 0.005)
+    assert s.timing["achieved_s"] == pytest.approx(0.01 * rows)
+
+    # Steps are made at the requested rate
+    times = gp.step_times(s.pins[0][0])
+    assert np.allclose(np.diff(times), 0.01)
+
+
+def test_simulated_gpio_overhead():
+    # GPIO calls taking 1ms still give 10ms steps, as
+    # the scheduler takes the overhead out of its waits
+    gp = RecordingGPIO(call_time=0.001)
+    s = Spider(gp=gp, auto_reset=False, step_time=0.01)
+    s.position = s.position + np.array([0.5, 0.0, 0.0])
+    times = gp.step_times(s.pins[0][0])
+    assert np.allclose(np.diff(times), 0.01)
+    assert s.timing["late_edges"] == 0
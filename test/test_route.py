@@ -0,0 +1,86 @@
+from spider_printer.paths.route import read_route, write_route, read_header, RouteWriter, normalize_route, \
+    route_bounds, route_extent, iter_normalized, iter_route_chunks
+import numpy as np
+import os
+import pytest
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "paths", "examples")
+
+
+def test_read_legacy_xy():
+    route = read_route(os.path.join(EXAMPLES, "x_line.xy"))
+    assert route.shape == (3, 2)
+    assert list(route[:, 0]) == [0, 1, 0]
+
+
+@pytest.mark.parametrize("fname", ["route.xy", "route.xyb"])
+def test_route_round_trip(tmp_path, fname):
+    route = np.random.random((1000, 2)) * 100 - 50
+    write_route(tmp_path / fname, route)
+    assert np.allclose(read_route(tmp_path / fname), route, rtol=1e-14, atol=0)
+
+
+def test_binary_route_header(tmp_path):
+    route = np.random.random((100, 2))
+    write_route(tmp_path / "route.xyb", route, dtype=np.float32)
+
+    header = read_header(tmp_path / "route.xyb")
+    assert header["points"] == 100
+    assert header["dtype"] == np.float32
+    assert np.allclose(header["bounds"], [np.min(route, axis=0), np.max(route, axis=0)], atol=1e-6)
+
+    loaded = read_route(tmp_path / "route.xyb")
+    assert isinstance(loaded, np.memmap)
+    assert np.allclose(loaded, route, atol=1e-6)
+
+
+@pytest.mark.parametrize("fname", ["route.xy", "route.xyb"])
+def test_route_writer_chunks(tmp_path, fname):
+    route = np.random.random((1000, 2))
+    with RouteWriter(tmp_path / fname) as writer:
+        for chunk in np.array_split(route, 7):
+            writer.write(chunk)
+    assert writer.points == 1000
+    assert np.allclose(read_route(tmp_path / fname), route)
+
+
+def test_normalize_route():
+    route = normalize_route([[0, 0], [4, 1], [2, 2]], scale=2.0, center=True)
+    assert np.allclose(np.max(route, axis=0), [1.0, 0.5])
+    assert np.allclose(np.min(route, axis=0), [-1.0, -0.5])
+
+
+@pytest.mark.parametrize("fname", ["route.xy", "route.xyb"])
+def test_streamed_route(tmp_path, fname):
+    route = np.random.random((1000, 2)) * 10
+    write_route(tmp_path / fname, route)
+
+    n, bounds = route_extent(tmp_path / fname, chunk_size=64)
+    assert n == 1000
+    assert np.allclose(bounds, route_bounds(route))
+
+    chunks = list(iter_normalized(tmp_path / fname, scale=3.0, center=True, chunk_size=64))
+    assert max(len(c) for c in chunks) == 64
+    assert np.allclose(np.vstack(chunks), normalize_route(route, scale=3.0, center=True))
+
+
+def test_streamed_route_blank_lines(tmp_path):
+    # Chunks of only blank lines (or comments) at the end of a text route are skipped
+    route = np.random.random((100, 2))
+    write_route(tmp_path / "route.xy", route)
+    with open(tmp_path / "route.xy", "a") as f:
+        f.write("\n" * 20 + "# end\n" + "\n" * 20)
+
+    chunks = list(iter_route_chunks(tmp_path / "route.xy", chunk_size=10))
+    assert all(len(c) > 0 for c in chunks)
+    assert np.allclose(np.vstack(chunks), route)
+
+    n, bounds = route_extent(tmp_path / "route.xy", chunk_size=10)
+    assert n == 100
+    assert np.allclose(bounds, route_bounds(route))
+
+    with RouteWriter(tmp_path / "copy.xyb") as writer:
+        for chunk in iter_route_chunks(tmp_path / "route.xy", chunk_size=10):
+            writer.write(chunk)
+        writer.write(np.zeros((0, 2)))
+    assert read_header(tmp_path / "copy.xyb")["points"] == 100
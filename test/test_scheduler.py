@@ -0,0 +1,82 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.scheduler import StepScheduler
+
+
+class FakeClock:
+    # A clock that only moves when slept on, or when work is simulated
+
+    def __init__(self):
+        self.now = 0
+
+    def clock_ns(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += round(seconds * 1e9)
+
+
+def test_scheduler_absorbs_overhead():
+    clock = FakeClock()
+    s = StepScheduler(clock_ns=clock.clock_ns, sleep=clock.sleep, spin_ns=0)
+    s.start()
+    for n in range(100):
+        clock.now += 1_000_000  # 1ms of "GPIO overhead" per edge
+        s.wait(0.005)
+
+    # The overhead comes out of the wait, so the period is kept
+    assert clock.now == 100 * 5_000_000
+    assert s.late_edges == 0
+    assert s.achieved_ns == s.target_ns
+
+
+def test_scheduler_catches_up_then_resyncs():
+    clock = FakeClock()
+    s = StepScheduler(clock_ns=clock.clock_ns, sleep=clock.sleep, spin_ns=0, resync_after=0.5)
+    s.start()
+
+    # A small hiccup is caught up on over the next edges
+    clock.now += 7_000_000
+    s.wait(0.005)
+    assert s.late_edges == 1 and s.resyncs == 0
+    s.wait(0.005)
+    assert clock.now == 10_000_000
+
+    # A large one restarts the schedule
+    clock.now += 50_000_000
+    s.wait(0.005)
+    assert s.resyncs == 1
+    s.wait(0.005)
+    assert clock.now == 65_000_000
+
+
+def test_scheduler_stall_keeps_edges_apart():
+    # A 19ms stall at 1ms steps doesn't fire the missed edges back to back
+    clock = FakeClock()
+    s = StepScheduler(clock_ns=clock.clock_ns, sleep=clock.sleep, spin_ns=0)
+    s.start()
+    edges = []
+    for n in range(40):
+        if n == 10:
+            clock.now += 19_000_000
+        s.wait(0.001)
+        edges.append(clock.now)
+    assert s.resyncs == 1
+    assert min(b - a for a, b in zip(edges[10:], edges[11:])) >= 500_000
+
+
+def test_scheduler_real_clock():
+    s = StepScheduler()
+    s.start()
+    for n in range(20):
+        s.wait(0.001)
+    assert s.achieved_ns >= s.target_ns
+    assert s.achieved_ns < s.target_ns + 50_000_000
+
+
+def test_spider_timing_fake_gpio():
+    s = Spider(gp=FakeGPIO(), auto_reset=False, step_time=0.01)
+    s.position = s.position + (0.5, 0, 0)
+    steps = max(abs(x) for x in s.steps)
+    assert s.timing["edges"] == 2 * steps
+    assert abs(s.timing["target_s"] - 0.01 * steps) < 1e-9
@@ -0,0 +1,51 @@
+from spider_printer.paths.generation.self_avoiding_random_walk import self_avoiding_random_walk, smooth_path, \
+    boundary_mask
+import numpy as np
+import pytest
+
+
+def test_smooth_path():
+    path = np.cumsum(np.random.default_rng(0).normal(size=(1000, 2)), axis=0)
+    for smooth in [0.0, 0.5, 1.0]:
+        # The original in-place loop
+        expected = path.copy()
+        f = 1 - smooth
+        for i in range(1, len(expected) - 1):
+            expected[i] = f*expected[i] + (smooth/2)*expected[i-1] + (smooth/2)*expected[i+1]
+        assert np.allclose(smooth_path(path, smooth), expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("boundary", ["circle", "square"])
+def test_self_avoiding_random_walk(boundary):
+    walk = self_avoiding_random_walk(50, 0.5, smooth=0.0, boundary=boundary, seed=1)
+    assert walk.shape == (1250, 2)
+    assert np.array_equal(walk[0], [25, 25])
+
+    # One square at a time, staying within the boundary
+    assert np.all(np.sum(np.abs(np.diff(walk, axis=0)), axis=1) == 1)
+    allowed = boundary_mask(50, boundary)
+    assert np.all(allowed[walk[:, 0].astype(int) + 1, walk[:, 1].astype(int) + 1])
+
+    # Only revisiting squares when boxed in
+    visited = set()
+    for prev, square in zip(map(tuple, walk[:-1].astype(int)), map(tuple, walk[1:].astype(int))):
+        if square in visited:
+            neighbours = [(prev[0] + dx, prev[1] + dy) for dx, dy in [(-1, 0), (1, 0), (0, 1), (0, -1)]]
+            assert all(n in visited or not allowed[n[0] + 1, n[1] + 1] for n in neighbours)
+        visited.add(square)
+
+    # The same walk for the same seed
+    assert np.array_equal(walk, self_avoiding_random_walk(50, 0.5, smooth=0.0, boundary=boundary, seed=1))
+    smoothed = self_avoiding_random_walk(50, 0.5, boundary=boundary, seed=1)
+    assert np.allclose(smoothed, smooth_path(walk, 0.5))
+
+
+def test_edge_bias():
+    walk = self_avoiding_random_walk(40, 0.3, smooth=0.0, edge_bias=0.5, seed=2)
+    assert walk.shape == (480, 2)
+    assert np.all(np.sum(np.abs(np.diff(walk, axis=0)), axis=1) == 1)
+
+
+def test_unknown_boundary():
+    with pytest.raises(ValueError):
+        boundary_mask(10, "hexagon")
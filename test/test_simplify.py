@@ -0,0 +1,54 @@
+from spider_printer.paths.simplify import simplify_indices, simplify_route, segment_distances, step_tolerance
+import numpy as np
+import pytest
+
+
+def rdp_reference(route, tolerance, a=0, b=None):
+    # Recursive Ramer-Douglas-Peucker, for comparison
+    b = len(route) - 1 if b is None else b
+    if b - a < 2:
+        return [a, b]
+    d = segment_distances(route[a + 1:b], np.repeat(route[a:a + 1], b - a - 1, axis=0),
+                          np.repeat(route[b:b + 1], b - a - 1, axis=0))
+    k = a + 1 + np.argmax(d)
+    if d[k - a - 1] <= tolerance:
+        return [a, b]
+    return rdp_reference(route, tolerance, a, k)[:-1] + rdp_reference(route, tolerance, k, b)
+
+
+@pytest.mark.parametrize("dims", [2, 3])
+def test_matches_recursive(dims):
+    rng = np.random.default_rng(dims)
+    route = np.cumsum(rng.normal(size=(2000, dims)), axis=0)
+    for tolerance in [0.1, 1.0, 10.0]:
+        assert list(simplify_indices(route, tolerance)) == rdp_reference(route, tolerance)
+
+
+def test_simplify_dense_circle():
+    t = np.linspace(0, 2 * np.pi, 100000)
+    route = np.column_stack([np.cos(t), np.sin(t)])
+    simplified, report = simplify_route(route, 1e-3)
+
+    assert report["points_before"] == 100000
+    assert report["points_after"] == len(simplified) < 200
+    assert report["reduction"] > 0.99
+    assert np.all(simplified[0] == route[0]) and np.all(simplified[-1] == route[-1])
+
+    # No dropped point strays more than the tolerance
+    idx = simplify_indices(route, 1e-3)
+    span = np.searchsorted(idx, np.arange(len(route)), side="right") - 1
+    span = np.minimum(span, len(idx) - 2)
+    d = segment_distances(route, route[idx[span]], route[idx[span + 1]])
+    assert np.max(d) <= 1e-3
+
+
+def test_simplify_short_routes():
+    assert list(simplify_indices(np.zeros((0, 2)), 1.0)) == []
+    assert list(simplify_indices(np.zeros((1, 2)), 1.0)) == [0]
+    assert list(simplify_indices(np.array([[0, 0], [1, 0], [2, 0]]), 0.0)) == [0, 2]
+
+
+def test_step_tolerance():
+    class FakeSpider:
+        steps_per_dl = 200
+    assert step_tolerance(FakeSpider()) == 0.5 / 200
@@ -0,0 +1,43 @@
+from spider_printer.spider.simulate import simulate, format_report
+from spider_printer.spider.spider import Spider, HEIGHT, MM_PER_REV
+from spider_printer.spider.fake_gpio import FakeGPIO
+import numpy as np
+import pytest
+
+
+def circle_route(n):
+    theta = np.linspace(0, 2 * np.pi, n)
+    return np.array([np.cos(theta), np.sin(theta), np.full(n, -HEIGHT)]).T
+
+
+def test_simulate_report():
+    route = circle_route(200)
+    report = simulate(route)
+    assert report["points"] == 200
+    assert len(report["trajectory"]) == report["pulses"] + 1
+    assert len(report["deviation_mm"]) == report["pulses"]
+    assert report["max_deviation_mm"] >= report["rms_deviation_mm"] > 0
+    assert "Max deviation" in format_report(report)
+
+    # Ends up where the spider's own step targets put it
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    end = s.positions_from_steps(s.step_targets(route)[-1:])[0]
+    assert np.allclose(report["trajectory"][-1], end)
+
+
+def test_simulate_dense_route_stays_close():
+    # Within a couple of steps of the route, with short moves
+    report = simulate(circle_route(400))
+    assert report["max_deviation_mm"] < 2 * MM_PER_REV / 200
+
+
+def test_simulate_coarse_route_strays_further():
+    dense = simulate(circle_route(400))
+    coarse = simulate(circle_route(8))
+    assert coarse["max_deviation_mm"] > dense["max_deviation_mm"]
+
+
+def test_simulate_empty_route():
+    report = simulate(np.zeros((0, 3)))
+    assert report["pulses"] == 0
+    assert report["max_deviation_mm"] == 0
@@ -2,6 +2,7 @@ from spider_printer import Spider
 from spider_printer.spider.spider import MM_PER_REV
 from spider_printer.spider.fake_gpio import FakeGPIO
 import numpy as np
+import pytest
 
 
 def test_spider_position():
@@ -31,3 +32,42 @@ def test_random_start_positions():
         x[2] = -1 - x[2]
         s = Spider(gp=FakeGPIO(), initial_position=x)
         assert max(abs(s.position - x)) < 0.1
+
+
+def test_wire_lengths_at_many():
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    xs = np.random.random((50, 3))
+    xs[:, 2] = -1 - xs[:, 2]
+    many = s.wire_lengths_at_many(xs)
+    assert many.shape == (50, 3)
+    for x, ls in zip(xs, many):
+        assert np.allclose(s.wire_lengths_at(x), ls)
+
+
+def test_step_targets_match_moves():
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    xs = np.random.random((20, 3))
+    xs[:, 2] = -1 - xs[:, 2]
+    targets = s.step_targets(xs)
+    for x, t in zip(xs, targets):
+        s.position = x
+        assert list(t) == s.steps
+
+
+def test_geometry_is_immutable():
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    with pytest.raises(ValueError):
+        s.geometry.motor_positions[0, 0] = 1.0
+
+
+def test_positions_from_wire_lengths():
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    xs = np.random.random((50, 3))
+    xs[:, 2] = -1 - xs[:, 2]
+
+    # Forward kinematics inverts inverse kinematics, for whole batches
+    assert np.allclose(s.positions_from_wire_lengths(s.wire_lengths_at_many(xs)), xs)
+
+    # Planned step targets land within a step of the requested positions
+    drift = np.linalg.norm(s.positions_from_steps(s.step_targets(xs)) - xs, axis=1)
+    assert max(drift) < 0.1
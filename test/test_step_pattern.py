@@ -0,0 +1,28 @@
+from spider_printer.spider.step_pattern import make_step_pattern
+import numpy as np
+
+
+def test_step_pattern_totals():
+    for n in range(100):
+        abs_steps = np.random.randint(0, 1000, 3)
+        pattern = make_step_pattern(abs_steps)
+        assert pattern.dtype == bool
+        assert pattern.shape == (max(abs_steps), 3)
+        assert np.all(np.sum(pattern, axis=0) == abs_steps)
+
+
+def test_step_pattern_interleaving():
+    abs_steps = [12, 4, 0]
+    pattern = make_step_pattern(abs_steps)
+
+    # Largest motor steps on every row, all motors finish on the last row
+    assert np.all(pattern[:, 0])
+    assert pattern[-1, 1]
+    assert not np.any(pattern[:, 2])
+
+    # Other motors are spread evenly
+    assert list(np.flatnonzero(pattern[:, 1])) == [2, 5, 8, 11]
+
+
+def test_step_pattern_no_steps():
+    assert make_step_pattern([0, 0, 0]).shape == (0, 3)
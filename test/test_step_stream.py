@@ -0,0 +1,34 @@
+from spider_printer import Spider
+from spider_printer.spider.fake_gpio import FakeGPIO
+from spider_printer.spider.step_stream import StepStream, compile_route
+import numpy as np
+
+
+def random_route(n):
+    route = np.random.random((n, 3))
+    route[:, 2] = -1 - route[:, 2]
+    return route
+
+
+def test_compile_and_play(tmp_path):
+    route = random_route(20)
+
+    s = Spider(gp=FakeGPIO(), auto_reset=False)
+    stream = compile_route(s, route)
+    stream.save(tmp_path / "route.steps")
+    stream = StepStream.load(tmp_path / "route.steps")
+
+    # Playing the stream ends up where moving point-by-point does
+    s.play(stream)
+    s_ref = Spider(gp=FakeGPIO(), auto_reset=False)
+    for r in route:
+        s_ref.position = r
+    assert s.steps == s_ref.steps == list(stream.end_steps)
+
+
+def test_stream_run_length_encoding():
+    # A straight move along a single motor is a single run
+    stream = StepStream.from_step_targets([[0, 0, 500], [0, 0, 0]])
+    assert len(stream) == 2
+    assert list(stream.records["count"]) == [500, 500]
+    assert list(stream.end_steps) == [0, 0, 0]